@@ -0,0 +1,43 @@
+"""Change processed_messages.telegram_id to BIGINT
+
+Revision ID: 20261016090000
+Revises: 20260214155358
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016090000'
+down_revision: Union[str, Sequence[str], None] = '20260214155358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Store Telegram user IDs in processed_messages as BIGINT."""
+    # batch_alter_table recreates the table on SQLite, which has no ALTER COLUMN TYPE
+    with op.batch_alter_table('processed_messages') as batch_op:
+        batch_op.alter_column(
+            'telegram_id',
+            existing_type=sa.String(),
+            type_=sa.BigInteger(),
+            existing_nullable=False,
+            postgresql_using='telegram_id::bigint'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Store Telegram user IDs in processed_messages as strings."""
+    with op.batch_alter_table('processed_messages') as batch_op:
+        batch_op.alter_column(
+            'telegram_id',
+            existing_type=sa.BigInteger(),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using='telegram_id::varchar'
+        )
@@ -0,0 +1,58 @@
+"""Change remaining telegram_id columns to BIGINT
+
+Revision ID: 20261016100000
+Revises: 20261016090000
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016100000'
+down_revision: Union[str, Sequence[str], None] = '20261016090000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose telegram_id column still stores Telegram user IDs as strings
+TABLES = (
+    'users',
+    'astro_profiles',
+    'birth_data',
+    'readings',
+    'pipeline_logs',
+    'natal_charts',
+    'debug_sessions',
+    'user_natal_charts',
+    'conversation_messages',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema: Store Telegram user IDs as BIGINT in all remaining tables."""
+    # batch_alter_table recreates the table on SQLite, which has no ALTER COLUMN TYPE
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'telegram_id',
+                existing_type=sa.String(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using='telegram_id::bigint'
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Store Telegram user IDs as strings in all remaining tables."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                'telegram_id',
+                existing_type=sa.BigInteger(),
+                type_=sa.String(),
+                existing_nullable=False,
+                postgresql_using='telegram_id::varchar'
+            )
@@ -0,0 +1,46 @@
+"""Replace conversation_messages single-column indexes with a composite index
+
+Revision ID: 20261016110000
+Revises: 20261016100000
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016110000'
+down_revision: Union[str, Sequence[str], None] = '20261016100000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Index conversation_messages on (telegram_id, created_at)."""
+    # Thread reads filter by telegram_id and order by created_at
+    op.create_index(
+        'ix_conv_tid_created',
+        'conversation_messages',
+        ['telegram_id', 'created_at']
+    )
+    
+    # The composite index covers telegram_id lookups; drop the redundant indexes
+    op.drop_index('ix_conversation_messages_telegram_id', table_name='conversation_messages', if_exists=True)
+    op.drop_index('ix_conversation_messages_created_at', table_name='conversation_messages', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Restore the single-column conversation_messages indexes."""
+    op.create_index(
+        'ix_conversation_messages_created_at',
+        'conversation_messages',
+        ['created_at']
+    )
+    op.create_index(
+        'ix_conversation_messages_telegram_id',
+        'conversation_messages',
+        ['telegram_id']
+    )
+    op.drop_index('ix_conv_tid_created', table_name='conversation_messages')
@@ -0,0 +1,40 @@
+"""Add server-side default to conversation_messages.created_at
+
+Revision ID: 20261016120000
+Revises: 20261016110000
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016120000'
+down_revision: Union[str, Sequence[str], None] = '20261016110000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Let the database fill in conversation_messages.created_at."""
+    with op.batch_alter_table('conversation_messages') as batch_op:
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(),
+            server_default=sa.func.now(),
+            existing_nullable=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the server-side default from conversation_messages.created_at."""
+    with op.batch_alter_table('conversation_messages') as batch_op:
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(),
+            server_default=None,
+            existing_nullable=True
+        )
@@ -0,0 +1,44 @@
+"""Drop is_first_pair from conversation_messages
+
+Revision ID: 20261016130000
+Revises: 20261016120000
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016130000'
+down_revision: Union[str, Sequence[str], None] = '20261016120000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Drop is_first_pair; the first pair is the two oldest messages."""
+    with op.batch_alter_table('conversation_messages') as batch_op:
+        batch_op.drop_column('is_first_pair')
+
+
+def downgrade() -> None:
+    """Downgrade schema: Restore is_first_pair and mark each thread's two oldest messages."""
+    with op.batch_alter_table('conversation_messages') as batch_op:
+        batch_op.add_column(sa.Column('is_first_pair', sa.Boolean(), nullable=True, server_default=sa.false()))
+    
+    op.execute("""
+        UPDATE conversation_messages
+        SET is_first_pair = TRUE
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY telegram_id ORDER BY created_at, id
+                ) AS position
+                FROM conversation_messages
+            ) AS ordered
+            WHERE position <= 2
+        )
+    """)
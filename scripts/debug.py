@@ -24,7 +24,7 @@ if DEBUG_MODE and DEVELOPER_TELEGRAM_ID:
     logger.info(f"Developer Telegram ID configured: {DEVELOPER_TELEGRAM_ID}")
 
 
-def is_developer(telegram_id: str) -> bool:
+def is_developer(telegram_id: int) -> bool:
     """Check if the user is the developer"""
     if not DEBUG_MODE or not DEVELOPER_TELEGRAM_ID:
         return False
@@ -55,7 +55,7 @@ def hash_prompt(prompt: str) -> str:
 # ============================================================================
 
 def log_pipeline_stage_1_raw_input(
-    telegram_id: str,
+    telegram_id: int,
     raw_user_message: str,
     session_id: Optional[str] = None
 ) -> str:
@@ -264,7 +264,7 @@ def log_pipeline_error(session_id: str, error_message: str):
 # ============================================================================
 
 def store_natal_chart(
-    telegram_id: str,
+    telegram_id: int,
     birth_data: Dict[str, Any],
     natal_chart: Dict[str, Any],
     engine_version: str,
@@ -321,7 +321,7 @@ def get_natal_chart(chart_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_user_latest_natal_chart(telegram_id: str) -> Optional[Dict[str, Any]]:
+def get_user_latest_natal_chart(telegram_id: int) -> Optional[Dict[str, Any]]:
     """Get user's most recent natal chart"""
     try:
         session = SessionLocal()
@@ -383,7 +383,7 @@ def track_reading_prompt(
 # DEBUG SESSION MANAGEMENT
 # ============================================================================
 
-def create_debug_session(telegram_id: str, session_id: str) -> Optional[int]:
+def create_debug_session(telegram_id: int, session_id: str) -> Optional[int]:
     """Create a new debug session for tracking. Returns session ID or None."""
     if not DEBUG_MODE:
         return None
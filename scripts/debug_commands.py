@@ -15,7 +15,7 @@ from scripts.debug import is_developer, DEBUG_MODE
 logger = logging.getLogger(__name__)
 
 
-async def handle_debug_command(telegram_id: str, command: str, send_message_func) -> bool:
+async def handle_debug_command(telegram_id: int, command: str, send_message_func) -> bool:
     """
     Handle debug commands. Returns True if command was handled.
     
@@ -60,7 +60,7 @@ async def handle_debug_command(telegram_id: str, command: str, send_message_func
     return True
 
 
-async def handle_debug_birth(telegram_id: str, send_message_func):
+async def handle_debug_birth(telegram_id: int, send_message_func):
     """
     /debug_birth command - Shows parsed and normalized birth data
     """
@@ -131,7 +131,7 @@ async def handle_debug_birth(telegram_id: str, send_message_func):
         await send_message_func(f"❌ Error retrieving debug data: {str(e)}")
 
 
-async def handle_debug_chart(telegram_id: str, send_message_func):
+async def handle_debug_chart(telegram_id: int, send_message_func):
     """
     /debug_chart command - Shows natal chart JSON
     """
@@ -193,7 +193,7 @@ async def handle_debug_chart(telegram_id: str, send_message_func):
         await send_message_func(f"❌ Error retrieving chart data: {str(e)}")
 
 
-async def handle_debug_pipeline(telegram_id: str, send_message_func):
+async def handle_debug_pipeline(telegram_id: int, send_message_func):
     """
     /debug_pipeline command - Shows complete pipeline trace
     """
@@ -288,7 +288,7 @@ async def handle_debug_pipeline(telegram_id: str, send_message_func):
         await send_message_func(f"❌ Error retrieving pipeline data: {str(e)}")
 
 
-async def handle_show_chart(telegram_id: str, send_message_func):
+async def handle_show_chart(telegram_id: int, send_message_func):
     """
     /show_chart command - Shows chart visualization (SVG)
     """
@@ -3,7 +3,9 @@ import json
 import httpx
 import logging
 import asyncio
-from datetime import datetime, timezone
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
 from src.services.chart_builder import build_natal_chart_text_and_json
 from src.llm import (
     extract_birth_data,
@@ -48,8 +50,8 @@ from scripts.debug_commands import handle_debug_command
 from src.user_commands import handle_user_command
 from src.chart_parser import parse_uploaded_chart, validate_chart_data, MAX_ORIGINAL_INPUT_LENGTH
 from src.thread_manager import add_message_to_thread, get_conversation_thread, reset_thread, get_thread_summary
-from src.services.date_parser import parse_transit_date
-from src.services.transit_builder import build_transits, format_transits_for_llm
+from src.services.date_parser import parse_transit_date_async
+from src.services.transit_builder import build_transits_async, format_transits_for_llm
 from src.services.intent_router import detect_request_type, detect_request_type_async
 from src.prompt_loader import load_response_prompt
 from src.message_cache import mark_all_pending_as_replied, mark_message_as_replied
@@ -66,11 +68,40 @@ else:
     logger.info("Bot initialized with Telegram token configured")
 
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
+logger.info("Telegram API URL configured")
 
 # Telegram message length limit (4096 characters)
 MAX_TELEGRAM_MESSAGE_LENGTH = 4096
+LEADING_WHITESPACE_PATTERN = re.compile(r'\s*')  # Used by split_message between chunks
+
+# One long-lived HTTP client for the Telegram API, so replies reuse pooled
+# keep-alive connections instead of a TCP+TLS handshake per message.
+# Timeout: 30s for connection, 60s for read/write, 30s for pool
+TELEGRAM_HTTP_TIMEOUT = httpx.Timeout(connect=30.0, read=60.0, write=60.0, pool=30.0)
+TELEGRAM_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32)
+_telegram_client: Optional[httpx.AsyncClient] = None
+
+
+def get_telegram_client() -> httpx.AsyncClient:
+    """
+    Return the shared Telegram API client, creating it on first use.
+    
+    Returns:
+        Open httpx.AsyncClient with connection pooling
+    """
+    global _telegram_client
+    if _telegram_client is None or _telegram_client.is_closed:
+        _telegram_client = httpx.AsyncClient(timeout=TELEGRAM_HTTP_TIMEOUT, limits=TELEGRAM_HTTP_LIMITS)
+    return _telegram_client
+
+
+async def close_telegram_client() -> None:
+    """Close the shared Telegram API client (called on application shutdown)."""
+    global _telegram_client
+    if _telegram_client is not None:
+        await _telegram_client.aclose()
+        _telegram_client = None
 
-logger.info("Telegram API URL configured")
 
 def split_message(text: str, max_length: int = MAX_TELEGRAM_MESSAGE_LENGTH) -> list[str]:
     """
@@ -88,39 +119,46 @@ def split_message(text: str, max_length: int = MAX_TELEGRAM_MESSAGE_LENGTH) -> l
         return [text]
     
     chunks = []
-    remaining = text
+    text_length = len(text)
+    start = 0  # Cursor into text; avoids copying the unsent remainder on every chunk
     
-    while remaining:
-        if len(remaining) <= max_length:
-            chunks.append(remaining)
+    while start < text_length:
+        if text_length - start <= max_length:
+            chunks.append(text[start:])
             break
-            
-        # Try to find a good split point
+        
+        # Try to find a good split point; every search is confined to the
+        # current window, so the whole text is scanned only once overall
+        end = start + max_length
         split_point = max_length
         
         # Look for paragraph break (double newline)
-        chunk = remaining[:max_length]
-        last_double_newline = chunk.rfind('\n\n')
+        last_double_newline = text.rfind('\n\n', start, end) - start
         if last_double_newline > max_length * 0.5:  # Only if in the latter half
             split_point = last_double_newline + 2
         else:
             # Look for single newline
-            last_newline = chunk.rfind('\n')
+            last_newline = text.rfind('\n', start, end) - start
             if last_newline > max_length * 0.5:
                 split_point = last_newline + 1
             else:
                 # Look for sentence end
-                last_period = max(chunk.rfind('. '), chunk.rfind('! '), chunk.rfind('? '))
-                if last_period >= 0 and last_period > max_length * 0.5:
+                last_period = max(
+                    text.rfind('. ', start, end),
+                    text.rfind('! ', start, end),
+                    text.rfind('? ', start, end)
+                ) - start
+                if last_period > max_length * 0.5:
                     split_point = last_period + 2
                 else:
                     # Look for word boundary
-                    last_space = chunk.rfind(' ')
-                    if last_space >= 0 and last_space > max_length * 0.5:
+                    last_space = text.rfind(' ', start, end) - start
+                    if last_space > max_length * 0.5:
                         split_point = last_space + 1
         
-        chunks.append(remaining[:split_point].rstrip())
-        remaining = remaining[split_point:].lstrip()
+        chunks.append(text[start:start + split_point].rstrip())
+        # Skip the whitespace the next chunk would otherwise start with
+        start = LEADING_WHITESPACE_PATTERN.match(text, start + split_point).end()
     
     return chunks
 
@@ -144,66 +182,64 @@ async def send_telegram_message(chat_id: int, text: str, parse_mode: str = "HTML
     
     try:
         last_response = None
-        # Configure timeout: 30s for connection, 60s for read/write, 30s for pool
-        timeout = httpx.Timeout(connect=30.0, read=60.0, write=60.0, pool=30.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            for i, chunk in enumerate(message_chunks, 1):
-                # Add small delay between chunks to avoid rate limiting (except for first chunk)
-                if i > 1:
-                    await asyncio.sleep(0.1)
-                
-                payload = {
-                    "chat_id": chat_id,
-                    "text": chunk
-                }
-                if parse_mode:
-                    payload["parse_mode"] = parse_mode
-                
-                response = await client.post(
-                    f"{TELEGRAM_API_URL}/sendMessage",
-                    json=payload
+        client = get_telegram_client()
+        for i, chunk in enumerate(message_chunks, 1):
+            # Add small delay between chunks to avoid rate limiting (except for first chunk)
+            if i > 1:
+                await asyncio.sleep(0.1)
+            
+            payload = {
+                "chat_id": chat_id,
+                "text": chunk
+            }
+            if parse_mode:
+                payload["parse_mode"] = parse_mode
+            
+            response = await client.post(
+                f"{TELEGRAM_API_URL}/sendMessage",
+                json=payload
+            )
+            # Check if the request was successful (2xx status codes)
+            if response.is_success:
+                logger.info(
+                    f"Message chunk {i}/{len(message_chunks)} sent successfully "
+                    f"to chat_id={chat_id}, status={response.status_code}"
                 )
-                # Check if the request was successful (2xx status codes)
-                if response.is_success:
-                    logger.info(
-                        f"Message chunk {i}/{len(message_chunks)} sent successfully "
-                        f"to chat_id={chat_id}, status={response.status_code}"
-                    )
-                    last_response = response
-                elif response.status_code in [400, 404]:
-                    # 400 or 404 typically means the chat doesn't exist, user blocked the bot, or invalid chat_id
-                    # This is not a critical error - log it and return None without raising
+                last_response = response
+            elif response.status_code in [400, 404]:
+                # 400 or 404 typically means the chat doesn't exist, user blocked the bot, or invalid chat_id
+                # This is not a critical error - log it and return None without raising
+                logger.warning(
+                    f"Cannot send message chunk {i}/{len(message_chunks)} to chat_id={chat_id}: "
+                    f"Chat not found (status={response.status_code}). "
+                    f"User may have blocked the bot or chat_id is invalid."
+                )
+                logger.debug(f"{response.status_code} Response details: {response.text}")
+                # If this is the first chunk, return None immediately
+                # If later chunks fail, at least some message was delivered
+                if i == 1:
+                    return None
+                else:
                     logger.warning(
-                        f"Cannot send message chunk {i}/{len(message_chunks)} to chat_id={chat_id}: "
-                        f"Chat not found (status={response.status_code}). "
-                        f"User may have blocked the bot or chat_id is invalid."
+                        f"Partial message delivered ({i - 1}/{len(message_chunks)} chunks) "
+                        f"before {response.status_code} error"
                     )
-                    logger.debug(f"{response.status_code} Response details: {response.text}")
-                    # If this is the first chunk, return None immediately
-                    # If later chunks fail, at least some message was delivered
-                    if i == 1:
-                        return None
-                    else:
-                        logger.warning(
-                            f"Partial message delivered ({i - 1}/{len(message_chunks)} chunks) "
-                            f"before {response.status_code} error"
-                        )
-                        return last_response
+                    return last_response
+            else:
+                logger.error(
+                    f"Failed to send message chunk {i}/{len(message_chunks)} to chat_id={chat_id}, "
+                    f"status={response.status_code}, response={response.text}"
+                )
+                # If this is the first chunk, raise exception
+                # If later chunks fail, log but don't raise (partial delivery is better than nothing)
+                if i == 1:
+                    raise Exception(f"Telegram API returned status {response.status_code}: {response.text}")
                 else:
                     logger.error(
-                        f"Failed to send message chunk {i}/{len(message_chunks)} to chat_id={chat_id}, "
-                        f"status={response.status_code}, response={response.text}"
+                        f"Failed to send remaining chunks. "
+                        f"Partial message delivered ({i - 1}/{len(message_chunks)} chunks)"
                     )
-                    # If this is the first chunk, raise exception
-                    # If later chunks fail, log but don't raise (partial delivery is better than nothing)
-                    if i == 1:
-                        raise Exception(f"Telegram API returned status {response.status_code}: {response.text}")
-                    else:
-                        logger.error(
-                            f"Failed to send remaining chunks. "
-                            f"Partial message delivered ({i - 1}/{len(message_chunks)} chunks)"
-                        )
-                        return last_response
+                    return last_response
         
         return last_response
     except Exception as e:
@@ -211,7 +247,7 @@ async def send_telegram_message(chat_id: int, text: str, parse_mode: str = "HTML
         raise
 
 
-def get_or_create_user(session, telegram_id: str) -> User:
+def get_or_create_user(session, telegram_id: int) -> User:
     """Get existing user or create new one"""
     logger.debug(f"Getting or creating user with telegram_id={telegram_id}")
     try:
@@ -232,7 +268,7 @@ def get_or_create_user(session, telegram_id: str) -> User:
 
 
 def update_user_state(
-    session, telegram_id: str, state: str,
+    session, telegram_id: int, state: str,
     natal_chart_json: str = None, missing_fields: str = None,
     commit: bool = True
 ):
@@ -257,7 +293,7 @@ def update_user_state(
         raise
 
 
-def save_birth_data(session, telegram_id: str, birth_data: dict, commit: bool = True):
+def save_birth_data(session, telegram_id: int, birth_data: dict, commit: bool = True):
     """Save birth data to database"""
     logger.debug(f"Saving birth data for telegram_id={telegram_id}")
     try:
@@ -278,7 +314,7 @@ def save_birth_data(session, telegram_id: str, birth_data: dict, commit: bool =
         raise
 
 
-def save_reading(session, telegram_id: str, reading_text: str, birth_data_id: int = None):
+def save_reading(session, telegram_id: int, reading_text: str, birth_data_id: int = None):
     """Save reading to database"""
     logger.debug(f"Saving reading for telegram_id={telegram_id}")
     try:
@@ -346,16 +382,18 @@ def generate_natal_chart_kerykeion(birth_data: dict) -> dict:
         lat = birth_data["lat"]
         lng = birth_data["lng"]
         
-        # Parse date components
-        year, month, day = map(int, dob.split("-"))
+        # Parse date components; the date constructor rejects impossible
+        # dates (Feb 30, Feb 29 outside leap years, month 13) before Kerykeion runs.
+        # Unpadded dates like "1990-5-3" pass confirmation, so they must parse here too
+        birth_date = date(*map(int, dob.split("-")))
         hour, minute = map(int, time.split(":"))
         
         # Build chart using Kerykeion
         result = build_natal_chart_text_and_json(
             name="User",
-            year=year,
-            month=month,
-            day=day,
+            year=birth_date.year,
+            month=birth_date.month,
+            day=birth_date.day,
             hour=hour,
             minute=minute,
             lat=lat,
@@ -480,7 +518,7 @@ def get_active_profile(session, user: User):
         raise
 
 
-def create_profile(session, telegram_id: str, birth_data: dict, natal_chart: dict,
+def create_profile(session, telegram_id: int, birth_data: dict, natal_chart: dict,
                    profile_name: str = None, profile_type: str = "self", commit: bool = True) -> AstroProfile:
     """
     Create a new AstroProfile.
@@ -547,7 +585,7 @@ def set_active_profile(session, user: User, profile_id: int, commit: bool = True
         raise
 
 
-def list_user_profiles(session, telegram_id: str):
+def list_user_profiles(session, telegram_id: int):
     """
     Get all profiles for a user.
     
@@ -1193,18 +1231,10 @@ async def handle_chatting_about_chart(session, user: User, chat_id: int, text: s
         if response is not None:
             mark_reading_delivered(session, reading_id)
         
-        # Update user profile after interaction (async, don't wait)
-        from src.user_profile_manager import update_profile_after_interaction
+        # Update user profile after interaction in the background (don't wait)
+        from src.user_profile_manager import schedule_profile_update
         try:
-            # Get updated conversation history (now includes latest exchange)
-            updated_history = get_conversation_thread(session, user.telegram_id)
-            update_profile_after_interaction(
-                session=session,
-                telegram_id=user.telegram_id,
-                conversation_history=updated_history,
-                latest_user_message=text,
-                latest_assistant_response=reading
-            )
+            schedule_profile_update(user.telegram_id, text, reading)
         except Exception as profile_error:
             logger.warning(f"Profile update failed (non-critical): {profile_error}")
         
@@ -1480,11 +1510,11 @@ async def handle_transit_question(session, user: User, chat_id: int, text: str):
                 chart = json.loads(profile.natal_chart_json)
         
         # Parse transit date from user's message
-        transit_date = parse_transit_date(text)
+        transit_date = await parse_transit_date_async(text)
         logger.info(f"Parsed transit date: {transit_date.isoformat()}")
         
         # Calculate transits
-        transits = build_transits(chart, transit_date)
+        transits = await build_transits_async(chart, transit_date)
         transits_text = format_transits_for_llm(transits)
         
         logger.info("Transits calculated successfully")
@@ -1619,7 +1649,7 @@ async def handle_telegram_update(update: dict):
             return {"ok": True}
         
         chat_id = message["chat"]["id"]
-        telegram_id = str(message["from"]["id"])
+        telegram_id = message["from"]["id"]  # Integer ID, used for processed message tracking
         message_id = message.get("message_id")
         text = message.get("text", "")
         
@@ -23,6 +23,23 @@ PLANET_NAMES = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
 
 ASPECT_NAMES = ["Conjunction", "Opposition", "Trine", "Square", "Sextile"]
 
+# Line patterns for AstroSeek-style uploads, compiled once at import
+# Planet: degree°minutes' Sign, House number (optional R for retrograde)
+PLANET_LINE_PATTERN = re.compile(
+    r'(\w+):\s*(\d+)°(\d+)[\'\′]?\s+(\w+)(?:,?\s+House\s+(\d+))?(?:\s*\(R\))?',
+    re.IGNORECASE
+)
+# Planet1 AspectType Planet2 (orb: value°)
+ASPECT_LINE_PATTERN = re.compile(
+    r'(\w+)\s+(\w+)\s+(\w+)(?:\s*\(orb:\s*(\d+\.?\d*)°?\))?',
+    re.IGNORECASE
+)
+# House 1: 26°30' Virgo
+HOUSE_LINE_PATTERN = re.compile(
+    r'House\s+(\d+):\s*(\d+)°(\d+)[\'\′]?\s+(\w+)',
+    re.IGNORECASE
+)
+
 
 def normalize_sign_name(sign: str) -> Optional[str]:
     """Normalize zodiac sign name"""
@@ -80,11 +97,7 @@ def parse_astro_seek_format(text: str) -> Dict:
         
         # Try to parse planet position
         # Pattern: Planet: degree°minutes' Sign, House number (optional R for retrograde)
-        planet_match = re.match(
-            r'(\w+):\s*(\d+)°(\d+)[\'\′]?\s+(\w+)(?:,?\s+House\s+(\d+))?(?:\s*\(R\))?',
-            line,
-            re.IGNORECASE
-        )
+        planet_match = PLANET_LINE_PATTERN.match(line)
         
         if planet_match:
             planet_name = normalize_planet_name(planet_match.group(1))
@@ -112,11 +125,7 @@ def parse_astro_seek_format(text: str) -> Dict:
         
         # Try to parse aspect
         # Pattern: Planet1 AspectType Planet2 (orb: value°)
-        aspect_match = re.match(
-            r'(\w+)\s+(\w+)\s+(\w+)(?:\s*\(orb:\s*(\d+\.?\d*)°?\))?',
-            line,
-            re.IGNORECASE
-        )
+        aspect_match = ASPECT_LINE_PATTERN.match(line)
         
         if aspect_match:
             from_planet = normalize_planet_name(aspect_match.group(1))
@@ -136,11 +145,7 @@ def parse_astro_seek_format(text: str) -> Dict:
         
         # Try to parse house cusp
         # Pattern: House 1: 26°30' Virgo
-        house_match = re.match(
-            r'House\s+(\d+):\s*(\d+)°(\d+)[\'\′]?\s+(\w+)',
-            line,
-            re.IGNORECASE
-        )
+        house_match = HOUSE_LINE_PATTERN.match(line)
         
         if house_match:
             house_num = house_match.group(1)
@@ -146,7 +146,7 @@ def get_planet_color(planet_name: str) -> str:
     return colors.get(planet_name, "#FFFFFF")
 
 
-def save_chart_svg(telegram_id: str, natal_chart: Dict[str, Any], charts_dir: str = "./charts") -> str:
+def save_chart_svg(telegram_id: int, natal_chart: Dict[str, Any], charts_dir: str = "./charts") -> str:
     """
     Generate and save SVG chart to file.
     
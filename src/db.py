@@ -1,6 +1,7 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 import logging
 
 # Configure logging
@@ -20,10 +21,25 @@ logger.info(f"Database backend: {db_backend}")
 logger.info(f"Configuring database with URL: {DATABASE_URL.split('@')[0] if '@' in DATABASE_URL else DATABASE_URL}")
 
 # For PostgreSQL, use psycopg2; for SQLite, use default driver
+engine_options = {}
+if DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+    # TEST-ONLY. An in-memory database lives inside one connection, so every
+    # session (from any thread) shares that single DBAPI connection and its
+    # transaction: concurrent sessions interleave, and a rollback in one discards
+    # the others' pending writes. That is fine for the test suite, which awaits
+    # background work before asserting, but this engine must never serve the
+    # threaded background paths (e.g. executor-run profile updates) for real traffic
+    logger.warning("Using a shared in-memory SQLite connection; this configuration is for tests only")
+    engine_options = {
+        "connect_args": {"check_same_thread": False},
+        "poolclass": StaticPool,
+    }
+
 engine = create_engine(
     DATABASE_URL, 
     echo=False,
     pool_pre_ping=True,  # Verify connections before using them
+    **engine_options
 )
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
@@ -2,6 +2,8 @@ import os
 import json
 import logging
 import asyncio
+import threading
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from src.prompt_loader import load_parser_prompt, load_response_prompt, load_personality
@@ -19,6 +21,20 @@ MAX_MESSAGE_CONTENT_LENGTH = 200  # Maximum characters per message in conversati
 # Thread pool executor for running blocking LLM calls in async context
 _executor = ThreadPoolExecutor(max_workers=10)
 
+# LRU cache of intent classifications for short messages that users repeat
+# verbatim ("да", "привет", "/start"), keyed by the stripped, lowercased text
+INTENT_CACHE_SIZE = 2048
+INTENT_CACHE_MAX_TEXT_LENGTH = 200  # Longer messages are rarely repeated and skip the cache
+_intent_cache: "OrderedDict[str, dict]" = OrderedDict()
+_intent_cache_lock = threading.Lock()
+
+
+def clear_intent_cache() -> None:
+    """Clear the intent classification cache (useful for testing)."""
+    with _intent_cache_lock:
+        _intent_cache.clear()
+
+
 if LLM_PROVIDER == "deepseek":
     logger.info(f"Initializing LLM client with provider: {LLM_PROVIDER}")
     client = OpenAI(
@@ -345,6 +361,17 @@ def classify_intent(text: str) -> dict:
         Example: {"intent": "ask_about_chart", "confidence": 0.95}
     """
     logger.debug(f"classify_intent called with message length: {len(text)}")
+    
+    cache_key = text.strip().lower()
+    cacheable = len(cache_key) <= INTENT_CACHE_MAX_TEXT_LENGTH
+    if cacheable:
+        with _intent_cache_lock:
+            cached = _intent_cache.get(cache_key)
+            if cached is not None:
+                _intent_cache.move_to_end(cache_key)
+                logger.debug("Intent cache hit")
+                return dict(cached)
+    
     result = None  # Initialize to avoid UnboundLocalError
     try:
         # Use new prompt architecture (parser = no personality)
@@ -371,6 +398,13 @@ def classify_intent(text: str) -> dict:
         intent_data = json.loads(result)
         logger.info(f"Intent classified: {intent_data.get('intent')} with confidence {intent_data.get('confidence')}")
         
+        # Only successful classifications are cached; error fallbacks below are not
+        if cacheable:
+            with _intent_cache_lock:
+                _intent_cache[cache_key] = dict(intent_data)
+                if len(_intent_cache) > INTENT_CACHE_SIZE:
+                    _intent_cache.popitem(last=False)
+        
         return intent_data
     except json.JSONDecodeError as e:
         logger.exception(f"Failed to parse JSON from LLM response: {e}")
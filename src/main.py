@@ -1,10 +1,14 @@
 import os
+import hmac
 import logging
 from datetime import datetime, timezone
 from fastapi import FastAPI, Request
-from src.bot import handle_telegram_update
+from src.bot import handle_telegram_update, close_telegram_client
 from src.db import init_db, SessionLocal
-from src.message_cache import mark_if_new, has_pending_reply, mark_all_pending_as_replied, get_pending_messages
+from src.message_cache import (
+    mark_if_new, has_pending_reply, mark_all_pending_as_replied,
+    count_pending_other_than, fetch_pending_texts
+)
 from src.models import ProcessedMessage
 
 
@@ -35,6 +39,11 @@ logging.getLogger("uvicorn.access").addFilter(HealthCheckFilter())
 
 logger = logging.getLogger(__name__)
 
+# Environment configuration, read once at import time instead of per request
+RENDER_MODE = os.getenv("RENDER", "false").lower() == "true"
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+TELEGRAM_SECRET_TOKEN = os.getenv("TELEGRAM_SECRET_TOKEN")
+
 app = FastAPI()
 
 @app.on_event("startup")
@@ -42,15 +51,14 @@ async def startup():
     logger.info("=== Application starting up ===")
     
     # Log running mode
-    render_mode = os.getenv("RENDER", "false").lower() == "true"
-    mode = "render" if render_mode else "local"
+    mode = "render" if RENDER_MODE else "local"
     logger.info(f"Running mode: {mode}")
     
     # Log webhook status
-    webhook_enabled = bool(os.getenv("WEBHOOK_URL")) and render_mode
+    webhook_enabled = bool(WEBHOOK_URL) and RENDER_MODE
     logger.info(f"Webhook enabled: {webhook_enabled}")
     if webhook_enabled:
-        logger.info(f"Webhook URL: {os.getenv('WEBHOOK_URL')}")
+        logger.info(f"Webhook URL: {WEBHOOK_URL}")
     
     # Initialize database (synchronous call)
     init_db()
@@ -97,6 +105,12 @@ async def startup():
     
     logger.info("=== Application startup complete ===")
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Release the pooled Telegram API connections
+    await close_telegram_client()
+    logger.info("=== Application shut down ===")
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
@@ -106,10 +120,10 @@ async def telegram_webhook(request: Request):
     logger.info("Webhook endpoint called")
     try:
         # Verify Telegram secret token if configured (security feature)
-        secret_token = os.getenv("TELEGRAM_SECRET_TOKEN")
-        if secret_token:
-            received_token = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
-            if not received_token or received_token != secret_token:
+        # Constant-time comparison avoids leaking the token through response timing
+        if TELEGRAM_SECRET_TOKEN:
+            received_token = request.headers.get("X-Telegram-Bot-Api-Secret-Token") or ""
+            if not hmac.compare_digest(received_token.encode(), TELEGRAM_SECRET_TOKEN.encode()):
                 logger.warning("Webhook request rejected: invalid or missing secret token")
                 return {"ok": False, "error": "Unauthorized"}
         
@@ -121,43 +135,42 @@ async def telegram_webhook(request: Request):
         telegram_id = message.get("from", {}).get("id")
         message_text = message.get("text", "")
         
-        logger.debug(f"Webhook received: message_id={message_id}, chat_id={chat_id}, telegram_id={telegram_id}")
+        logger.debug("Webhook received: message_id=%s, chat_id=%s, telegram_id=%s", message_id, chat_id, telegram_id)
         
         # Check if this message has already been processed (atomic operation)
         # Only apply deduplication if we have valid IDs (not None)
         if message_id is not None and telegram_id is not None:
-            telegram_id_str = str(telegram_id)
-            
             # First, atomically mark this message in DB (prevents duplicates and establishes order)
-            is_new = mark_if_new(telegram_id_str, message_id, message_text)
+            is_new = mark_if_new(telegram_id, message_id, message_text)
             
             if not is_new:
-                logger.info(f"Skipping duplicate message {message_id} from user {telegram_id_str}")
+                logger.info("Skipping duplicate message %s from user %s", message_id, telegram_id)
                 return {"ok": True, "skipped": "duplicate"}
             
             # Now check if there are OTHER pending messages (excluding current one)
             # Since we marked current message first, it won't cause race conditions
-            pending_messages = get_pending_messages(telegram_id_str)
-            
-            # Filter out the current message from pending list (it was just added)
-            other_pending = [msg for msg in pending_messages if msg.message_id != message_id]
+            # Only a count is needed here - message text is fetched when combining
+            other_pending_count = count_pending_other_than(telegram_id, message_id)
             
-            if other_pending:
+            if other_pending_count:
                 # There are OTHER messages waiting for reply - throttle this one
                 logger.info(
-                    f"Message {message_id} from user {telegram_id_str} throttled - "
-                    f"user has {len(other_pending)} other pending message(s). Message will be combined later."
+                    "Message %s from user %s throttled - "
+                    "user has %d other pending message(s). Message will be combined later.",
+                    message_id,
+                    telegram_id,
+                    other_pending_count,
                 )
                 return {"ok": True, "throttled": True}
             
             # No other pending messages - this will be processed
             # But also retrieve any messages that were marked during processing start
             # This handles edge case where multiple messages arrive nearly simultaneously
-            pending_messages = get_pending_messages(telegram_id_str)
+            pending_texts = fetch_pending_texts(telegram_id)
             
-            if len(pending_messages) > 1:
+            if len(pending_texts) > 1:
                 # Multiple messages to process together (including current one)
-                all_texts = [msg.message_text for msg in pending_messages if msg.message_text]
+                all_texts = [text for text in pending_texts if text]
                 
                 # Only combine if we have actual text to combine
                 # If all pending messages have NULL text (e.g., old messages from before migration),
@@ -167,23 +180,27 @@ async def telegram_webhook(request: Request):
                     combined_text = "\n\n---\n\n".join(all_texts)
                     
                     logger.info(
-                        f"Combining {len(pending_messages)} pending message(s) "
-                        f"({len(all_texts)} with text) for user {telegram_id_str}"
+                        "Combining %d pending message(s) (%d with text) for user %s",
+                        len(pending_texts),
+                        len(all_texts),
+                        telegram_id,
                     )
                     
                     # Update the message text in the data structure to process combined message
                     data["message"]["text"] = combined_text
                 else:
                     logger.warning(
-                        f"Found {len(pending_messages)} pending message(s) for user {telegram_id_str} "
-                        f"but none have text content (possibly old messages from before migration). "
-                        f"Processing current message only."
+                        "Found %d pending message(s) for user %s "
+                        "but none have text content (possibly old messages from before migration). "
+                        "Processing current message only.",
+                        len(pending_texts),
+                        telegram_id,
                     )
         
         result = await handle_telegram_update(data)
-        logger.debug(f"Webhook processing result: {result}")
+        logger.debug("Webhook processing result: %s", result)
         return result
     except Exception as e:
-        logger.exception(f"Error processing webhook: {e}")
+        logger.exception("Error processing webhook: %s", e)
         # Return generic error to client, detailed error is in logs
         return {"ok": False, "error": "Internal server error"}
@@ -12,8 +12,10 @@ This prevents duplicate processing when:
 
 import logging
 import threading
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Tuple, NamedTuple
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple
 from sqlalchemy.orm import Session
 from src.db import SessionLocal
 from src.models import ProcessedMessage
@@ -28,19 +30,51 @@ class PendingMessage(NamedTuple):
     processed_at: datetime
 
 
-# In-memory cache: (telegram_id, message_id) -> timestamp
-# Provides fast lookups without database queries
-_processed_messages: Dict[Tuple[str, int], datetime] = {}
-
-# Thread lock for cache access
-_cache_lock = threading.RLock()
-
 # Cache configuration
+CACHE_SHARDS = 16  # Number of independently locked cache shards (must be a power of two)
 CACHE_EXPIRY_HOURS = 24  # How long to keep entries in memory cache
+CACHE_EXPIRY_SECONDS = CACHE_EXPIRY_HOURS * 3600
+MAX_PENDING_MESSAGES = 50  # Most recent pending messages combined into one reply; older ones are dropped
+CACHE_CLEANUP_INTERVAL = 1024  # Run expiry cleanup once per this many inserts into a shard (must be a power of two)
 # Note: Database entries are kept indefinitely (no expiry/deletion)
 
+# In-memory cache: shard -> telegram_id -> {message_id -> time.monotonic() timestamp}
+# Provides fast lookups without database queries. Users are spread over
+# CACHE_SHARDS independently locked shards so concurrent webhooks from different
+# users don't serialize on one mutex. Nesting per user means the
+# inner lookup only hashes the small message_id int instead of a tuple.
+# Both keys are the raw Telegram integers (hash(int) is the int itself), so no
+# combined hash key is derived - a mixed key could collide and drop a message.
+# Each user's entries are appended as they are marked, so the oldest entries
+# sit at the front of the bucket and expiry only has to look at its head
+_processed_messages: List[Dict[int, "OrderedDict[int, float]"]] = [{} for _ in range(CACHE_SHARDS)]
+
+# One lock per shard (not re-entrant: helpers named *_locked never re-acquire it)
+_cache_locks = [threading.Lock() for _ in range(CACHE_SHARDS)]
+
+# Number of messages marked per shard since startup, used to schedule cleanup
+_insert_counters = [0] * CACHE_SHARDS
+
+
+def _shard(telegram_id: int) -> int:
+    """Return the index of the cache shard that holds a user's entries."""
+    return hash(telegram_id) & (CACHE_SHARDS - 1)
+
+
+def _user_bucket_locked(shard: int, telegram_id: int) -> "OrderedDict[int, float]":
+    """
+    Get (or create) the in-memory cache bucket for a user.
+    
+    NOTE: This function assumes the caller already holds _cache_locks[shard].
+    """
+    users = _processed_messages[shard]
+    bucket = users.get(telegram_id)
+    if bucket is None:
+        bucket = users[telegram_id] = OrderedDict()
+    return bucket
+
 
-def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) -> bool:
+def mark_if_new(telegram_id: int, message_id: int, message_text: str = None) -> bool:
     """
     Atomically check if a message is new and mark it as processed.
     
@@ -50,7 +84,8 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
     3. Mark in both cache and database if new
     
     This operation is atomic to prevent race conditions when multiple
-    webhook requests arrive concurrently for the same message.
+    webhook requests arrive concurrently for the same message. Duplicates
+    already in the in-memory cache are answered without taking the shard lock.
     
     Args:
         telegram_id: Telegram user ID
@@ -61,38 +96,56 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
         True if the message was new and has been marked as processed,
         False if the message was already processed (duplicate)
     """
-    key = (telegram_id, message_id)
-    now = datetime.now(timezone.utc)
-    expiry_threshold = now - timedelta(hours=CACHE_EXPIRY_HOURS)
+    now = time.monotonic()
+    expiry_threshold = now - CACHE_EXPIRY_SECONDS
+    shard = _shard(telegram_id)
+    
+    # Step 0: Lock-free duplicate check. The shard lock is held across database
+    # round trips, so Telegram retries of an already cached message shouldn't
+    # queue behind it. Single dict lookups are atomic under the GIL; misses and
+    # expired entries fall through to the locked check below.
+    bucket = _processed_messages[shard].get(telegram_id)
+    processed_time = bucket.get(message_id) if bucket is not None else None
+    if processed_time is not None and processed_time >= expiry_threshold:
+        logger.debug(
+            "Message %s from user %s was already processed %.0fs ago (in-memory cache hit)",
+            message_id,
+            telegram_id,
+            now - processed_time,
+        )
+        return False
     
-    with _cache_lock:
-        # Step 1: Check in-memory cache first (fast path)
-        if key in _processed_messages:
-            processed_time = _processed_messages[key]
+    with _cache_locks[shard]:
+        # Step 1: Check in-memory cache again now that the lock is held
+        bucket = _processed_messages[shard].get(telegram_id)
+        if bucket is not None and message_id in bucket:
+            processed_time = bucket[message_id]
             
             # Check if entry is expired
             if processed_time < expiry_threshold:
                 # Entry is expired, remove it and check database
-                del _processed_messages[key]
+                del bucket[message_id]
                 logger.debug(
                     "Expired cache entry for message %s from user %s "
-                    "(processed at %s, expired at %s)",
+                    "(processed %.0fs ago, expiry is %ds)",
                     message_id,
                     telegram_id,
-                    processed_time,
-                    expiry_threshold,
+                    now - processed_time,
+                    CACHE_EXPIRY_SECONDS,
                 )
             else:
                 # Entry is valid - this is a duplicate
                 logger.debug(
-                    "Message %s from user %s was already processed at %s (in-memory cache hit)",
+                    "Message %s from user %s was already processed %.0fs ago (in-memory cache hit)",
                     message_id,
                     telegram_id,
-                    processed_time,
+                    now - processed_time,
                 )
                 return False
         
         # Step 2: Check database for persistence across restarts
+        # Read the wall clock once; it is shared by the age check and the insert
+        wall_now = datetime.now(timezone.utc)
         session = SessionLocal()
         try:
             existing = session.query(ProcessedMessage).filter_by(
@@ -115,7 +168,9 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
                     existing_time,
                 )
                 # Update in-memory cache to speed up future checks
-                _processed_messages[key] = existing_time
+                # Convert the wall-clock database time into the monotonic clock used in memory
+                age_seconds = (wall_now - existing_time).total_seconds()
+                _user_bucket_locked(shard, telegram_id)[message_id] = now - age_seconds
                 return False
             
             # Step 3: Message is new - mark it in both cache and database
@@ -123,7 +178,7 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
             new_entry = ProcessedMessage(
                 telegram_id=telegram_id,
                 message_id=message_id,
-                processed_at=now,
+                processed_at=wall_now,
                 message_text=message_text
             )
             session.add(new_entry)
@@ -146,7 +201,7 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
                     raise
             
             # Add to in-memory cache
-            _processed_messages[key] = now
+            _user_bucket_locked(shard, telegram_id)[message_id] = now
             
             logger.debug(
                 "Marked message %s from user %s as processed in cache and database",
@@ -154,16 +209,19 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
                 telegram_id,
             )
             
-            # Clean up old entries periodically
-            _cleanup_cache_and_db_locked(session)
+            # Clean up old entries periodically (expired entries that are looked up
+            # before then are still handled by the expiry check above)
+            _insert_counters[shard] += 1
+            if _insert_counters[shard] & (CACHE_CLEANUP_INTERVAL - 1) == 0:
+                _cleanup_cache_and_db_locked(session, shard, now)
             
             return True
             
         except Exception as e:
-            logger.exception(f"Error checking/marking message in database: {e}")
+            logger.exception("Error checking/marking message in database: %s", e)
             session.rollback()
             # If database fails, fall back to in-memory only (better than nothing)
-            _processed_messages[key] = now
+            _user_bucket_locked(shard, telegram_id)[message_id] = now
             logger.warning(
                 "Database check failed for message %s, marked in memory only",
                 message_id
@@ -173,31 +231,42 @@ def mark_if_new(telegram_id: str, message_id: int, message_text: str = None) ->
             session.close()
 
 
-def _cleanup_cache_and_db_locked(session: Session) -> None:
+def _cleanup_cache_and_db_locked(session: Session, shard: int, now: float) -> None:
     """
-    Remove expired entries from in-memory cache to prevent memory leaks.
+    Remove expired entries from one in-memory cache shard to prevent memory leaks.
     Database entries are kept indefinitely for audit trail.
-    Called automatically when marking new messages as processed.
+    Called automatically every CACHE_CLEANUP_INTERVAL messages marked in the shard.
     
-    NOTE: This function assumes the caller already holds _cache_lock.
+    NOTE: This function assumes the caller already holds _cache_locks[shard].
     
     Args:
         session: Active database session (unused but kept for API compatibility)
+        shard: Index of the shard to clean up
+        now: Caller's time.monotonic() reading, reused instead of reading the clock again
     """
-    now = datetime.now(timezone.utc)
-    memory_expiry_threshold = now - timedelta(hours=CACHE_EXPIRY_HOURS)
+    memory_expiry_threshold = now - CACHE_EXPIRY_SECONDS
     
     # Clean up in-memory cache only
-    expired_keys = [
-        key for key, timestamp in _processed_messages.items()
-        if timestamp < memory_expiry_threshold
-    ]
-    
-    for key in expired_keys:
-        del _processed_messages[key]
+    # Pop from the front of each user's bucket until the oldest remaining entry is
+    # still fresh, so the cost per user is proportional to the number of expired
+    # entries. Entries re-cached from a database hit may be older than their
+    # neighbours; those are still expired on lookup in mark_if_new().
+    users = _processed_messages[shard]
+    expired_count = 0
+    for telegram_id in list(users):
+        bucket = users[telegram_id]
+        while bucket:
+            _, timestamp = next(iter(bucket.items()))
+            if timestamp >= memory_expiry_threshold:
+                break
+            bucket.popitem(last=False)
+            expired_count += 1
+        if not bucket:
+            # Drop empty buckets so inactive users don't accumulate
+            del users[telegram_id]
     
-    if expired_keys:
-        logger.debug("Cleaned up %d expired in-memory cache entries", len(expired_keys))
+    if expired_count:
+        logger.debug("Cleaned up %d expired in-memory cache entries", expired_count)
 
 
 def get_cache_stats() -> Dict[str, int]:
@@ -207,25 +276,29 @@ def get_cache_stats() -> Dict[str, int]:
     Returns:
         Dictionary with cache statistics including both memory and database
     """
-    with _cache_lock:
-        stats = {
-            "memory_entries": len(_processed_messages),
-            "cache_expiry_hours": CACHE_EXPIRY_HOURS
-        }
-        
-        # Get database count
+    memory_entries = 0
+    for shard in range(CACHE_SHARDS):
+        with _cache_locks[shard]:
+            memory_entries += sum(len(bucket) for bucket in _processed_messages[shard].values())
+    
+    stats = {
+        "memory_entries": memory_entries,
+        "cache_expiry_hours": CACHE_EXPIRY_HOURS
+    }
+    
+    # Get database count
+    try:
+        session = SessionLocal()
         try:
-            session = SessionLocal()
-            try:
-                db_count = session.query(ProcessedMessage).count()
-                stats["db_entries"] = db_count
-            finally:
-                session.close()
-        except Exception as e:
-            logger.warning(f"Could not get database stats: {e}")
-            stats["db_entries"] = -1
-        
-        return stats
+            db_count = session.query(ProcessedMessage).count()
+            stats["db_entries"] = db_count
+        finally:
+            session.close()
+    except Exception as e:
+        logger.warning("Could not get database stats: %s", e)
+        stats["db_entries"] = -1
+    
+    return stats
 
 
 def clear_cache() -> None:
@@ -239,25 +312,26 @@ def clear_cache() -> None:
     
     WARNING: This will allow previously processed messages to be processed again!
     """
-    with _cache_lock:
-        # Clear in-memory cache
-        _processed_messages.clear()
-        logger.info("In-memory message cache cleared")
-        
-        # Clear database
+    # Clear in-memory cache
+    for shard in range(CACHE_SHARDS):
+        with _cache_locks[shard]:
+            _processed_messages[shard].clear()
+    logger.info("In-memory message cache cleared")
+    
+    # Clear database
+    try:
+        session = SessionLocal()
         try:
-            session = SessionLocal()
-            try:
-                deleted_count = session.query(ProcessedMessage).delete()
-                session.commit()
-                logger.info(f"Database message cache cleared ({deleted_count} entries)")
-            finally:
-                session.close()
-        except Exception as e:
-            logger.error(f"Error clearing database cache: {e}")
+            deleted_count = session.query(ProcessedMessage).delete()
+            session.commit()
+            logger.info("Database message cache cleared (%d entries)", deleted_count)
+        finally:
+            session.close()
+    except Exception as e:
+        logger.error("Error clearing database cache: %s", e)
 
 
-def has_pending_reply(telegram_id: str) -> bool:
+def has_pending_reply(telegram_id: int) -> bool:
     """
     Check if there are any messages from this user that haven't been replied to yet.
     
@@ -279,19 +353,21 @@ def has_pending_reply(telegram_id: str) -> bool:
         result = pending_count > 0
         if result:
             logger.debug(
-                f"User {telegram_id} has {pending_count} pending message(s) awaiting reply"
+                "User %s has %d pending message(s) awaiting reply",
+                telegram_id,
+                pending_count,
             )
         
         return result
     except Exception as e:
-        logger.exception(f"Error checking pending replies: {e}")
+        logger.exception("Error checking pending replies: %s", e)
         # On error, return False to allow processing (fail open)
         return False
     finally:
         session.close()
 
 
-def get_pending_messages(telegram_id: str) -> list[PendingMessage]:
+def get_pending_messages(telegram_id: int) -> list[PendingMessage]:
     """
     Get all pending messages (not replied yet) for a user with their text content.
     
@@ -313,7 +389,9 @@ def get_pending_messages(telegram_id: str) -> list[PendingMessage]:
         ).order_by(ProcessedMessage.processed_at).all()
         
         logger.debug(
-            f"Retrieved {len(messages)} pending message(s) for user {telegram_id}"
+            "Retrieved %d pending message(s) for user %s",
+            len(messages),
+            telegram_id,
         )
         
         return [
@@ -325,13 +403,91 @@ def get_pending_messages(telegram_id: str) -> list[PendingMessage]:
             for msg in messages
         ]
     except Exception as e:
-        logger.exception(f"Error retrieving pending messages: {e}")
+        logger.exception("Error retrieving pending messages: %s", e)
         return []
     finally:
         session.close()
 
 
-def mark_message_as_replied(telegram_id: str, message_id: int) -> bool:
+def count_pending_other_than(telegram_id: int, message_id: int) -> int:
+    """
+    Count pending messages (not replied yet) for a user, excluding one message.
+
+    Used by the webhook to decide whether to throttle the current message
+    without pulling message text across the wire.
+
+    Args:
+        telegram_id: Telegram user ID
+        message_id: Message ID to exclude (usually the message just marked)
+
+    Returns:
+        Number of other pending messages
+    """
+    from sqlalchemy import func
+    session = SessionLocal()
+    try:
+        pending_count = session.query(func.count()).select_from(ProcessedMessage).filter(
+            ProcessedMessage.telegram_id == telegram_id,
+            ProcessedMessage.reply_sent.is_(False),
+            ProcessedMessage.message_id != message_id
+        ).scalar()
+
+        logger.debug(
+            "User %s has %d other pending message(s) besides %s",
+            telegram_id,
+            pending_count,
+            message_id,
+        )
+
+        return pending_count
+    except Exception as e:
+        logger.exception("Error counting pending messages: %s", e)
+        # On error, return 0 to allow processing (fail open)
+        return 0
+    finally:
+        session.close()
+
+
+def fetch_pending_texts(telegram_id: int, limit: int = MAX_PENDING_MESSAGES) -> list[str]:
+    """
+    Get the text of the most recent pending messages (not replied yet) for a user.
+
+    Only the message_text column is selected; use get_pending_messages()
+    when the full metadata is needed. The result is capped so a user who keeps
+    sending messages while a reply is pending can't grow the combined prompt
+    without bound.
+
+    Args:
+        telegram_id: Telegram user ID
+        limit: Maximum number of most recent pending messages to return
+
+    Returns:
+        List of message texts ordered by processed_at (entries may be None
+        for messages stored before the message_text column existed)
+    """
+    session = SessionLocal()
+    try:
+        rows = session.query(ProcessedMessage.message_text).filter_by(
+            telegram_id=telegram_id,
+            reply_sent=False
+        ).order_by(ProcessedMessage.processed_at.desc(), ProcessedMessage.id.desc()).limit(limit).all()
+        rows.reverse()
+
+        logger.debug(
+            "Retrieved %d pending message text(s) for user %s",
+            len(rows),
+            telegram_id,
+        )
+
+        return [row.message_text for row in rows]
+    except Exception as e:
+        logger.exception("Error retrieving pending message texts: %s", e)
+        return []
+    finally:
+        session.close()
+
+
+def mark_message_as_replied(telegram_id: int, message_id: int) -> bool:
     """
     Mark a specific message as replied (used for commands that don't process pending messages).
     
@@ -356,23 +512,26 @@ def mark_message_as_replied(telegram_id: str, message_id: int) -> bool:
         
         if result > 0:
             logger.debug(
-                f"Marked message {message_id} as replied for user {telegram_id}"
+                "Marked message %s as replied for user %s",
+                message_id,
+                telegram_id,
             )
             return True
         else:
             logger.warning(
-                f"Could not mark message {message_id} as replied - message not found"
+                "Could not mark message %s as replied - message not found",
+                message_id,
             )
             return False
     except Exception as e:
-        logger.exception(f"Error marking message as replied: {e}")
+        logger.exception("Error marking message as replied: %s", e)
         session.rollback()
         return False
     finally:
         session.close()
 
 
-def mark_all_pending_as_replied(telegram_id: str) -> int:
+def mark_all_pending_as_replied(telegram_id: int) -> int:
     """
     Mark all pending messages for a user as replied.
     
@@ -395,12 +554,14 @@ def mark_all_pending_as_replied(telegram_id: str) -> int:
         session.commit()
         
         logger.debug(
-            f"Marked {result} pending message(s) as replied for user {telegram_id}"
+            "Marked %d pending message(s) as replied for user %s",
+            result,
+            telegram_id,
         )
         
         return result
     except Exception as e:
-        logger.exception(f"Error marking pending messages as replied: {e}")
+        logger.exception("Error marking pending messages as replied: %s", e)
         session.rollback()
         return 0
     finally:
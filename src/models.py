@@ -1,4 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Integer, Float, Text, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    func, Column, String, DateTime, Integer, BigInteger, Float, Text, Boolean,
+    ForeignKey, UniqueConstraint, Index,
+)
 from datetime import datetime, timezone
 from src.db import Base
 
@@ -13,7 +16,7 @@ STATE_CHATTING_ABOUT_CHART = "chatting_about_chart"
 class User(Base):
     __tablename__ = "users"
 
-    telegram_id = Column(String, primary_key=True)
+    telegram_id = Column(BigInteger, primary_key=True, autoincrement=False)  # Telegram user IDs are 64-bit integers
     first_seen = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     last_seen = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     state = Column(String, default=STATE_AWAITING_BIRTH_DATA)  # Use state constants defined above
@@ -33,7 +36,7 @@ class AstroProfile(Base):
     __tablename__ = "astro_profiles"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)  # FK to User
+    telegram_id = Column(BigInteger, nullable=False)  # FK to User
     name = Column(String, nullable=True)  # Optional name (e.g., "Maria", "Alex", or None for "self")
     profile_type = Column(String, default="self")  # self|partner|friend|analysis
     birth_data_json = Column(Text, nullable=False)  # JSON: {dob, time, lat, lng}
@@ -44,7 +47,7 @@ class BirthData(Base):
     __tablename__ = "birth_data"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     dob = Column(String, nullable=False)
     time = Column(String, nullable=False)
     lat = Column(Float, nullable=False)
@@ -55,7 +58,7 @@ class Reading(Base):
     __tablename__ = "readings"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     birth_data_id = Column(Integer, nullable=True)  # Reference to BirthData if needed
     reading_text = Column(Text, nullable=False)
     delivered = Column(Boolean, default=False)
@@ -75,7 +78,7 @@ class ProcessedMessage(Base):
     __tablename__ = "processed_messages"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False, index=True)
+    telegram_id = Column(BigInteger, nullable=False, index=True)  # Telegram user IDs are 64-bit integers
     message_id = Column(Integer, nullable=False, index=True)
     processed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     reply_sent = Column(Boolean, default=False, nullable=False, index=True)  # Track if bot replied to this message
@@ -101,7 +104,7 @@ class PipelineLog(Base):
     __tablename__ = "pipeline_logs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     session_id = Column(String, nullable=False)  # Not unique - multiple log entries per session across stages
     
     # Stage 1: Raw Input
@@ -136,7 +139,7 @@ class NatalChart(Base):
     __tablename__ = "natal_charts"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     
     # Complete chart data
     birth_data_json = Column(Text, nullable=False)  # DOB, time, lat, lng
@@ -163,7 +166,7 @@ class DebugSession(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(String, unique=True, nullable=False)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     
     # Pipeline references
     pipeline_log_id = Column(Integer, ForeignKey('pipeline_logs.id'), nullable=True)
@@ -184,7 +187,7 @@ class UserNatalChart(Base):
     __tablename__ = "user_natal_charts"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
     
     # Standardized chart data in JSON format
     # Contains: planets, houses, aspects, source, original_input, engine_version, created_at
@@ -212,8 +215,17 @@ class ConversationMessage(Base):
     __tablename__ = "conversation_messages"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False, index=True)
+    telegram_id = Column(BigInteger, nullable=False)
     role = Column(String, nullable=False)  # "user" or "assistant"
     content = Column(Text, nullable=False)  # Message text or summary
-    is_first_pair = Column(Boolean, default=False)  # True for first user+assistant messages
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    # Stamped in UTC by the application like every other table; the server default
+    # only backs up rows inserted outside the ORM. Threads are ordered by
+    # (created_at, id), so the value is always defaulted; the column itself stays
+    # nullable, so this is not enforced by the schema
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    
+    # Thread reads filter by user and order by time, so one composite index serves
+    # both the lookup and the ordering (it also covers telegram_id-only filters)
+    __table_args__ = (
+        Index('ix_conv_tid_created', 'telegram_id', 'created_at'),
+    )
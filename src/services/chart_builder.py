@@ -5,7 +5,10 @@ This module provides a standardized interface for generating natal charts
 with both text export (AstroSeek-compatible format) and structured JSON data.
 """
 
+import copy
 import logging
+import operator
+import threading
 from typing import Dict, Any, Optional
 from functools import lru_cache
 from kerykeion import AstrologicalSubject, NatalAspects
@@ -13,26 +16,65 @@ from timezonefinder import TimezoneFinder
 
 logger = logging.getLogger(__name__)
 
-# Initialize TimezoneFinder once at module level for better performance
-_timezone_finder = TimezoneFinder()
+# TimezoneFinder loads tens of MB of boundary data, so a single instance is
+# created on first lookup (not at import) and shared by all callers
+_timezone_finder: Optional[TimezoneFinder] = None
+_timezone_finder_lock = threading.Lock()
 
+# Coordinates are snapped to a grid of 1/TIMEZONE_GRID_SCALE degrees (~1.1 km)
+# before timezone lookup, so nearby birth places share one cache entry
+TIMEZONE_GRID_SCALE = 100
+TIMEZONE_CACHE_SIZE = 8192  # Grid cells; each entry is one short timezone name
 
-@lru_cache(maxsize=1000)
-def get_timezone_cached(lat_rounded: float, lng_rounded: float) -> Optional[str]:
+
+def _get_timezone_finder() -> TimezoneFinder:
+    """
+    Return the shared TimezoneFinder, creating it on first use.
+    
+    Returns:
+        The module-wide TimezoneFinder instance
+    """
+    global _timezone_finder
+    if _timezone_finder is None:
+        with _timezone_finder_lock:
+            if _timezone_finder is None:
+                _timezone_finder = TimezoneFinder()
+    return _timezone_finder
+
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def _timezone_for_cell(lat_cell: int, lng_cell: int) -> Optional[str]:
+    """
+    Look up the timezone at the centre of a grid cell.
+    
+    Args:
+        lat_cell: Latitude multiplied by TIMEZONE_GRID_SCALE and rounded
+        lng_cell: Longitude multiplied by TIMEZONE_GRID_SCALE and rounded
+        
+    Returns:
+        Timezone string or None if not found
+    """
+    return _get_timezone_finder().timezone_at(
+        lat=lat_cell / TIMEZONE_GRID_SCALE,
+        lng=lng_cell / TIMEZONE_GRID_SCALE
+    )
+
+
+def get_timezone_cached(lat: float, lng: float) -> Optional[str]:
     """
     Get timezone for coordinates with caching.
     
-    Uses LRU cache to avoid repeated lookups for the same coordinates.
-    Cache size of 1000 should be sufficient for typical usage patterns.
+    Uses an LRU cache keyed on integer grid cells, so repeated lookups for
+    the same city skip the TimezoneFinder query entirely.
     
     Args:
-        lat_rounded: Latitude (should be pre-rounded to 2 decimal places)
-        lng_rounded: Longitude (should be pre-rounded to 2 decimal places)
+        lat: Latitude
+        lng: Longitude
         
     Returns:
         Timezone string or None if not found
     """
-    return _timezone_finder.timezone_at(lat=lat_rounded, lng=lng_rounded)
+    return _timezone_for_cell(round(lat * TIMEZONE_GRID_SCALE), round(lng * TIMEZONE_GRID_SCALE))
 
 
 # Zodiac signs for reference
@@ -48,6 +90,30 @@ SIGN_MAP = {
     "Sag": "Sagittarius", "Cap": "Capricorn", "Aqu": "Aquarius", "Pis": "Pisces"
 }
 
+# Kerykeion house name to house number mapping
+HOUSE_NAME_MAP = {
+    "First_House": 1, "Second_House": 2, "Third_House": 3,
+    "Fourth_House": 4, "Fifth_House": 5, "Sixth_House": 6,
+    "Seventh_House": 7, "Eighth_House": 8, "Ninth_House": 9,
+    "Tenth_House": 10, "Eleventh_House": 11, "Twelfth_House": 12
+}
+
+# Fields read from each Kerykeion planet point, fetched in one call
+_PLANET_FIELDS = operator.attrgetter("name", "sign", "position", "house", "retrograde")
+
+# The main planets and the house cusps of a Kerykeion subject model, in order,
+# each fetched as a tuple in one call
+_PLANET_POINTS = operator.attrgetter(
+    "sun", "moon", "mercury", "venus", "mars",
+    "jupiter", "saturn", "uranus", "neptune", "pluto"
+)
+_HOUSE_CUSPS = operator.attrgetter(
+    "first_house", "second_house", "third_house",
+    "fourth_house", "fifth_house", "sixth_house",
+    "seventh_house", "eighth_house", "ninth_house",
+    "tenth_house", "eleventh_house", "twelfth_house"
+)
+
 
 def deg_to_dms(x: float) -> str:
     """
@@ -89,13 +155,219 @@ def parse_house_name(house_str: str) -> int:
     Returns:
         House number (1-12)
     """
-    house_names = {
-        "First_House": 1, "Second_House": 2, "Third_House": 3,
-        "Fourth_House": 4, "Fifth_House": 5, "Sixth_House": 6,
-        "Seventh_House": 7, "Eighth_House": 8, "Ninth_House": 9,
-        "Tenth_House": 10, "Eleventh_House": 11, "Twelfth_House": 12
+    return HOUSE_NAME_MAP.get(house_str, 1)
+
+
+@lru_cache(maxsize=512)
+def _compute_chart(
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: int,
+    minute: int,
+    lat: float,
+    lng: float,
+    city: str,
+    nation: str,
+    tz_str: str
+) -> Dict[str, Any]:
+    """
+    Run Kerykeion and build the text export and JSON for one set of birth data.
+    
+    Results are cached, so a user asking several questions about the same chart
+    only pays for the Swiss Ephemeris calculation once. Callers must not mutate
+    the returned dictionary; build_natal_chart_text_and_json() hands out copies.
+    
+    Args:
+        name: Name for the chart
+        year: Birth year
+        month: Birth month (1-12)
+        day: Birth day
+        hour: Birth hour (0-23)
+        minute: Birth minute (0-59)
+        lat: Birth latitude
+        lng: Birth longitude
+        city: Birth city name
+        nation: Birth country/nation name
+        tz_str: Resolved timezone string
+    
+    Returns:
+        Dictionary with text_export and chart_json
+    """
+    # Initialize Kerykeion chart instance with coordinates
+    # Setting online=False to avoid geonames API calls
+    chart = AstrologicalSubject(
+        name=name,
+        year=year,
+        month=month,
+        day=day,
+        hour=hour,
+        minute=minute,
+        lat=lat,
+        lng=lng,
+        tz_str=tz_str,
+        city=city,
+        nation=nation,
+        online=False
+    )
+    
+    # Note: We access chart._model to get the AstrologicalSubjectModel
+    # This is the documented way to access chart data in Kerykeion
+    # See: https://github.com/g-battaglia/kerykeion
+    # Every model field is read exactly once into locals below
+    model = chart._model
+    meta_city, meta_nation, meta_lat, meta_lng, meta_tz = (
+        model.city, model.nation, model.lat, model.lng, model.tz_str
+    )
+    
+    planets = _PLANET_POINTS(model)
+    houses = _HOUSE_CUSPS(model)
+    
+    # Planets section
+    planet_lines = []
+    planets_data = []
+    
+    for planet_obj in planets:
+        planet_name, sign_abbr, position, house_str, retrograde = _PLANET_FIELDS(planet_obj)
+        sign = SIGN_MAP.get(sign_abbr, sign_abbr)
+        house_num = parse_house_name(house_str) if house_str else None
+    
+        # Format position as degrees and minutes
+        pos_str = deg_to_dms(position)
+    
+        # Build planet line
+        planet_line = f"{planet_name} in {sign} {pos_str}"
+    
+        # Add retrograde marker
+        if retrograde:
+            planet_line += ", Retrograde"
+    
+        # Add house information if available
+        if house_num:
+            planet_line += f", in {house_num}{house_suffix(house_num)} House"
+    
+        planet_lines.append(planet_line)
+    
+        # Store planet data for JSON
+        planets_data.append({
+            "name": planet_name,
+            "sign": sign,
+            "position": round(position, 2),
+            "house": house_num,
+            "retrograde": retrograde
+        })
+    
+    # Angles section (ASC and MC)
+    # Ascendant (1st house cusp)
+    asc = houses[0]
+    asc_sign = SIGN_MAP.get(asc.sign, asc.sign)
+    asc_position = asc.position
+    asc_str = deg_to_dms(asc_position)
+    
+    # Midheaven (MC is the 10th house cusp)
+    mc = houses[9]
+    mc_sign = SIGN_MAP.get(mc.sign, mc.sign)
+    mc_position = mc.position
+    mc_str = deg_to_dms(mc_position)
+    
+    # Houses section
+    house_lines = []
+    houses_data = []
+    
+    for idx, house_obj in enumerate(houses, start=1):
+        house_sign_abbr = house_obj.sign
+        house_sign = SIGN_MAP.get(house_sign_abbr, house_sign_abbr)
+        house_position = house_obj.position
+        house_str = deg_to_dms(house_position)
+    
+        house_lines.append(f"{idx}{house_suffix(idx)} House in {house_sign} {house_str}")
+    
+        houses_data.append({
+            "number": idx,
+            "sign": house_sign,
+            "position": round(house_position, 2)
+        })
+    
+    # Aspects section
+    aspect_lines = []
+    aspects_data = []
+    
+    # Calculate aspects
+    aspects = NatalAspects(chart)
+    
+    for aspect_obj in aspects.all_aspects:
+        planet1 = aspect_obj.p1_name
+        planet2 = aspect_obj.p2_name
+        aspect_type = aspect_obj.aspect.capitalize()
+        orb = aspect_obj.orbit
+        is_applying = aspect_obj.aspect_movement == "Applying"
+    
+        # Format orb
+        orb_str = deg_to_dms(abs(orb))
+        applying_str = "Applying" if is_applying else "Separating"
+    
+        aspect_line = f"{planet1} {aspect_type} {planet2} (Orb: {orb_str}, {applying_str})"
+        aspect_lines.append(aspect_line)
+    
+        aspects_data.append({
+            "planet1": planet1,
+            "planet2": planet2,
+            "aspect": aspect_type,
+            "orb": round(abs(orb), 2),
+            "applying": is_applying
+        })
+    
+    # Build text export in AstroSeek format with a single join over all sections
+    text_export = "\n".join([
+        f"City: {meta_city}",
+        f"Country: {meta_nation}",
+        f"Latitude, Longitude: {meta_lat}, {meta_lng}",
+        "House system: Placidus system",
+        "",
+        "Planets:",
+        *planet_lines,
+        "",
+        "Angles:",
+        f"ASC in {asc_sign} {asc_str}",
+        f"MC in {mc_sign} {mc_str}",
+        "",
+        "Houses:",
+        *house_lines,
+        "",
+        "Aspects:",
+        *aspect_lines,
+    ])
+    
+    # Build structured JSON
+    chart_json = {
+        "planets": planets_data,
+        "houses": houses_data,
+        "aspects": aspects_data,
+        "angles": {
+            "asc": {
+                "sign": asc_sign,
+                "position": round(asc_position, 2)
+            },
+            "mc": {
+                "sign": mc_sign,
+                "position": round(mc_position, 2)
+            }
+        },
+        "meta": {
+            "city": meta_city,
+            "nation": meta_nation,
+            "lat": meta_lat,
+            "lng": meta_lng,
+            "timezone": meta_tz,
+            "engine": "kerykeion_swisseph"
+        }
+    }
+    
+    return {
+        "text_export": text_export,
+        "chart_json": chart_json
     }
-    return house_names.get(house_str, 1)
 
 
 def build_natal_chart_text_and_json(
@@ -140,204 +412,21 @@ def build_natal_chart_text_and_json(
     try:
         # Determine timezone if not provided (with caching)
         if tz_str is None:
-            # Round coordinates to 2 decimal places for better cache hits
-            # (precision of ~1.1km which is fine for timezone lookups)
-            lat_rounded = round(lat, 2)
-            lng_rounded = round(lng, 2)
-            tz_str = get_timezone_cached(lat_rounded, lng_rounded)
+            tz_str = get_timezone_cached(lat, lng)
             if tz_str is None:
                 tz_str = "UTC"  # Fallback to UTC if timezone can't be determined
                 logger.warning(f"Could not determine timezone for {lat}, {lng}, using UTC")
             else:
                 logger.info(f"Determined timezone: {tz_str}")
         
-        # Initialize Kerykeion chart instance with coordinates
-        # Setting online=False to avoid geonames API calls
-        chart = AstrologicalSubject(
-            name=name,
-            year=year,
-            month=month,
-            day=day,
-            hour=hour,
-            minute=minute,
-            lat=lat,
-            lng=lng,
-            tz_str=tz_str,
-            city=city,
-            nation=nation,
-            online=False
+        result = _compute_chart(
+            name, year, month, day, hour, minute, lat, lng, city, nation, tz_str
         )
         
-        # Build text export in AstroSeek format
-        text_lines = []
-        
-        # Note: We access chart._model to get the AstrologicalSubjectModel
-        # This is the documented way to access chart data in Kerykeion
-        # See: https://github.com/g-battaglia/kerykeion
-        
-        # Header section
-        text_lines.append(f"City: {chart._model.city}")
-        text_lines.append(f"Country: {chart._model.nation}")
-        text_lines.append(f"Latitude, Longitude: {chart._model.lat}, {chart._model.lng}")
-        text_lines.append("House system: Placidus system")
-        text_lines.append("")
-        
-        # Planets section
-        text_lines.append("Planets:")
-        planets_data = []
-        
-        # Define the main planets in order
-        planet_names = ['sun', 'moon', 'mercury', 'venus', 'mars',
-                        'jupiter', 'saturn', 'uranus', 'neptune', 'pluto']
-        
-        for planet_attr in planet_names:
-            planet_obj = getattr(chart._model, planet_attr)
-            planet_name = planet_obj.name
-            sign_abbr = planet_obj.sign
-            sign = SIGN_MAP.get(sign_abbr, sign_abbr)
-            position = planet_obj.position
-            house_str = planet_obj.house
-            house_num = parse_house_name(house_str) if house_str else None
-            retrograde = planet_obj.retrograde
-            
-            # Format position as degrees and minutes
-            pos_str = deg_to_dms(position)
-            
-            # Build planet line
-            planet_line = f"{planet_name} in {sign} {pos_str}"
-            
-            # Add retrograde marker
-            if retrograde:
-                planet_line += ", Retrograde"
-            
-            # Add house information if available
-            if house_num:
-                planet_line += f", in {house_num}{house_suffix(house_num)} House"
-            
-            text_lines.append(planet_line)
-            
-            # Store planet data for JSON
-            planets_data.append({
-                "name": planet_name,
-                "sign": sign,
-                "position": round(position, 2),
-                "house": house_num,
-                "retrograde": retrograde
-            })
-        
-        text_lines.append("")
-        
-        # Angles section (ASC and MC)
-        text_lines.append("Angles:")
-        
-        # Ascendant (1st house cusp)
-        asc = chart._model.first_house
-        asc_sign = SIGN_MAP.get(asc.sign, asc.sign)
-        asc_position = asc.position
-        asc_str = deg_to_dms(asc_position)
-        text_lines.append(f"ASC in {asc_sign} {asc_str}")
-        
-        # Midheaven (MC is the 10th house cusp)
-        mc = chart._model.tenth_house
-        mc_sign = SIGN_MAP.get(mc.sign, mc.sign)
-        mc_position = mc.position
-        mc_str = deg_to_dms(mc_position)
-        text_lines.append(f"MC in {mc_sign} {mc_str}")
-        
-        text_lines.append("")
-        
-        # Houses section
-        text_lines.append("Houses:")
-        houses_data = []
-        
-        # Get all house cusps
-        house_attrs = [
-            'first_house', 'second_house', 'third_house',
-            'fourth_house', 'fifth_house', 'sixth_house',
-            'seventh_house', 'eighth_house', 'ninth_house',
-            'tenth_house', 'eleventh_house', 'twelfth_house'
-        ]
-        
-        for idx, house_attr in enumerate(house_attrs, start=1):
-            house_obj = getattr(chart._model, house_attr)
-            house_sign_abbr = house_obj.sign
-            house_sign = SIGN_MAP.get(house_sign_abbr, house_sign_abbr)
-            house_position = house_obj.position
-            house_str = deg_to_dms(house_position)
-            
-            text_lines.append(f"{idx}{house_suffix(idx)} House in {house_sign} {house_str}")
-            
-            houses_data.append({
-                "number": idx,
-                "sign": house_sign,
-                "position": round(house_position, 2)
-            })
-        
-        text_lines.append("")
-        
-        # Aspects section
-        text_lines.append("Aspects:")
-        aspects_data = []
-        
-        # Calculate aspects
-        aspects = NatalAspects(chart)
-        
-        for aspect_obj in aspects.all_aspects:
-            planet1 = aspect_obj.p1_name
-            planet2 = aspect_obj.p2_name
-            aspect_type = aspect_obj.aspect.capitalize()
-            orb = aspect_obj.orbit
-            is_applying = aspect_obj.aspect_movement == "Applying"
-            
-            # Format orb
-            orb_str = deg_to_dms(abs(orb))
-            applying_str = "Applying" if is_applying else "Separating"
-            
-            aspect_line = f"{planet1} {aspect_type} {planet2} (Orb: {orb_str}, {applying_str})"
-            text_lines.append(aspect_line)
-            
-            aspects_data.append({
-                "planet1": planet1,
-                "planet2": planet2,
-                "aspect": aspect_type,
-                "orb": round(abs(orb), 2),
-                "applying": is_applying
-            })
-        
-        # Join all lines into text export
-        text_export = "\n".join(text_lines)
-        
-        # Build structured JSON
-        chart_json = {
-            "planets": planets_data,
-            "houses": houses_data,
-            "aspects": aspects_data,
-            "angles": {
-                "asc": {
-                    "sign": asc_sign,
-                    "position": round(asc_position, 2)
-                },
-                "mc": {
-                    "sign": mc_sign,
-                    "position": round(mc_position, 2)
-                }
-            },
-            "meta": {
-                "city": chart._model.city,
-                "nation": chart._model.nation,
-                "lat": chart._model.lat,
-                "lng": chart._model.lng,
-                "timezone": chart._model.tz_str,
-                "engine": "kerykeion_swisseph"
-            }
-        }
-        
         logger.info("Natal chart generated successfully using Kerykeion")
         
-        return {
-            "text_export": text_export,
-            "chart_json": chart_json
-        }
+        # The cached result is shared between calls; return a copy callers can modify
+        return copy.deepcopy(result)
         
     except Exception as e:
         logger.exception(f"Failed to generate natal chart with Kerykeion: {e}")
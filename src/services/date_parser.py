@@ -4,18 +4,112 @@ Uses LLM to extract dates from natural language, similar to birth data extractio
 """
 
 import logging
-from datetime import datetime, timezone, timedelta
-from src.llm import extract_transit_date
+from datetime import date, datetime, timezone, timedelta
+from typing import Optional
+from src.llm import extract_transit_date, extract_transit_date_async
 
 logger = logging.getLogger(__name__)
 
+# Inputs simple enough to resolve without an LLM round-trip:
+# ISO dates (YYYY-MM-DD, ISO_DATE_LENGTH chars) and the keywords below
+ISO_DATE_LENGTH = 10
+RELATIVE_DATE_KEYWORDS = {
+    "now": None,
+    "today": None,
+    "сейчас": None,
+    "сегодня": None,
+    "tomorrow": "tomorrow",
+    "завтра": "tomorrow",
+    "yesterday": "yesterday",
+    "вчера": "yesterday",
+    "next month": "next_month",
+    "в следующем месяце": "next_month",
+}
+
+
+def _fast_path_date_data(text: str) -> Optional[dict]:
+    """
+    Resolve ISO dates and bare relative keywords without calling the LLM.
+    
+    Args:
+        text: User's message text
+        
+    Returns:
+        Dict in the extract_transit_date() format, or None if the LLM is needed
+    """
+    stripped = text.strip()
+    
+    # date.fromisoformat() is implemented in C; the length and separator checks keep
+    # it to the YYYY-MM-DD form (it also accepts e.g. "20250314" or week dates)
+    if len(stripped) == ISO_DATE_LENGTH and stripped[4] == "-" and stripped[7] == "-":
+        try:
+            return {"date": date.fromisoformat(stripped).isoformat()}
+        except ValueError:
+            # Looks like a date but isn't one (e.g. 2024-02-30); let the LLM handle it
+            return None
+    
+    keyword = stripped.lower().rstrip("?!.")
+    if keyword in RELATIVE_DATE_KEYWORDS:
+        return {"date": RELATIVE_DATE_KEYWORDS[keyword]}
+    
+    return None
+
+
+def _resolve_transit_date(date_data: dict) -> datetime:
+    """
+    Turn the LLM's transit date extraction result into a UTC datetime.
+    
+    Args:
+        date_data: Result of extract_transit_date() with a "date" key
+        
+    Returns:
+        datetime object in UTC timezone. Defaults to current UTC if no date found.
+    """
+    date_str = date_data.get("date")
+    
+    if not date_str:
+        # No date specified or "now" - use current UTC
+        logger.info("No date specified or 'now' detected, using current UTC time")
+        return datetime.now(timezone.utc)
+    
+    # Handle relative dates
+    if date_str == "tomorrow":
+        logger.info("Relative date: tomorrow")
+        return datetime.now(timezone.utc) + timedelta(days=1)
+    elif date_str == "next_month":
+        logger.info("Relative date: next month")
+        now = datetime.now(timezone.utc)
+        # Move to first day of next month
+        if now.month == 12:
+            return datetime(now.year + 1, 1, 1, 12, 0, tzinfo=timezone.utc)
+        else:
+            return datetime(now.year, now.month + 1, 1, 12, 0, tzinfo=timezone.utc)
+    elif date_str == "yesterday":
+        logger.info("Relative date: yesterday")
+        return datetime.now(timezone.utc) - timedelta(days=1)
+    
+    # Parse absolute date (YYYY-MM-DD format from LLM)
+    try:
+        # LLM should return dates in YYYY-MM-DD format; strptime also accepts
+        # unpadded replies like "2025-3-5", which date.fromisoformat() rejects
+        parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
+        # Set to noon UTC
+        result = datetime(parsed_date.year, parsed_date.month, parsed_date.day, 12, 0, tzinfo=timezone.utc)
+        logger.info(f"Parsed date from LLM: {result.isoformat()}")
+        return result
+    except ValueError as e:
+        logger.warning(f"Failed to parse date '{date_str}' from LLM: {e}")
+        # Fallback to current UTC
+        return datetime.now(timezone.utc)
+
 
 def parse_transit_date(text: str) -> datetime:
     """
     Parse date from user text for transit calculations using LLM.
     
     Uses LLM to extract date from natural language, similar to how birth data is extracted.
-    This provides better support for various formats and languages.
+    This provides better support for various formats and languages. ISO dates and
+    bare relative keywords ("tomorrow", "завтра", ...) are resolved without the LLM.
     
     Args:
         text: User's message text
@@ -25,44 +119,38 @@ def parse_transit_date(text: str) -> datetime:
     """
     logger.debug(f"Parsing transit date from text: {text[:100]}...")
     
+    date_data = _fast_path_date_data(text)
+    if date_data is not None:
+        logger.debug("Transit date resolved without LLM")
+        return _resolve_transit_date(date_data)
+    
     try:
         # Use LLM to extract date
-        date_data = extract_transit_date(text)
-        date_str = date_data.get("date")
-        
-        if not date_str:
-            # No date specified or "now" - use current UTC
-            logger.info("No date specified or 'now' detected, using current UTC time")
-            return datetime.now(timezone.utc)
-        
-        # Handle relative dates
-        if date_str == "tomorrow":
-            logger.info("Relative date: tomorrow")
-            return datetime.now(timezone.utc) + timedelta(days=1)
-        elif date_str == "next_month":
-            logger.info("Relative date: next month")
-            now = datetime.now(timezone.utc)
-            # Move to first day of next month
-            if now.month == 12:
-                return datetime(now.year + 1, 1, 1, 12, 0, tzinfo=timezone.utc)
-            else:
-                return datetime(now.year, now.month + 1, 1, 12, 0, tzinfo=timezone.utc)
-        elif date_str == "yesterday":
-            logger.info("Relative date: yesterday")
-            return datetime.now(timezone.utc) - timedelta(days=1)
-        
-        # Parse absolute date (YYYY-MM-DD format from LLM)
-        try:
-            # LLM should return dates in YYYY-MM-DD format
-            parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
-            # Set to noon UTC
-            result = datetime(parsed_date.year, parsed_date.month, parsed_date.day, 12, 0, tzinfo=timezone.utc)
-            logger.info(f"Parsed date from LLM: {result.isoformat()}")
-            return result
-        except ValueError as e:
-            logger.warning(f"Failed to parse date '{date_str}' from LLM: {e}")
-            # Fallback to current UTC
-            return datetime.now(timezone.utc)
+        return _resolve_transit_date(extract_transit_date(text))
+    
+    except Exception as e:
+        logger.exception(f"Error in LLM-based date parsing: {e}")
+        # Fallback to current UTC
+        logger.warning("Falling back to current UTC time due to error")
+        return datetime.now(timezone.utc)
+
+
+async def parse_transit_date_async(text: str) -> datetime:
+    """
+    Async version of parse_transit_date that uses non-blocking LLM calls.
+    
+    See parse_transit_date() for full documentation.
+    """
+    logger.debug(f"Parsing transit date from text: {text[:100]}...")
+    
+    date_data = _fast_path_date_data(text)
+    if date_data is not None:
+        logger.debug("Transit date resolved without LLM")
+        return _resolve_transit_date(date_data)
+    
+    try:
+        # Use async LLM to extract date
+        return _resolve_transit_date(await extract_transit_date_async(text))
     
     except Exception as e:
         logger.exception(f"Error in LLM-based date parsing: {e}")
@@ -18,6 +18,36 @@ logger = logging.getLogger(__name__)
 
 IntentType = Literal["birth_input", "change_profile", "natal_question"]
 
+# LLM intents with their own routing category; every other intent
+# (ask_about_chart, ask_general_question, meta_conversation, clarify_birth_data,
+# new_profile_request, unknown, and ask_transit_question while transits are
+# disabled) falls back to DEFAULT_INTENT
+INTENT_MAP = {
+    "provide_birth_data": "birth_input",
+    "change_profile": "change_profile",
+}
+DEFAULT_INTENT: IntentType = "natal_question"
+
+
+def _route_intent(intent_result: dict) -> IntentType:
+    """
+    Map a classify_intent() result to a routing category.
+    
+    Args:
+        intent_result: Dict with "intent" and "confidence" keys
+        
+    Returns:
+        One of: "birth_input", "change_profile", "natal_question"
+    """
+    llm_intent = intent_result.get("intent", "unknown")
+    confidence = intent_result.get("confidence", 0.0)
+    
+    logger.info(f"LLM classified intent as: {llm_intent} (confidence: {confidence})")
+    
+    intent_type = INTENT_MAP.get(llm_intent, DEFAULT_INTENT)
+    logger.info(f"Intent detected: {intent_type} (mapped from {llm_intent})")
+    return intent_type
+
 
 def detect_request_type(user_text: str) -> IntentType:
     """
@@ -48,27 +78,8 @@ def detect_request_type(user_text: str) -> IntentType:
     
     try:
         # Use LLM to classify intent
-        intent_result = classify_intent(user_text)
-        llm_intent = intent_result.get("intent", "unknown")
-        confidence = intent_result.get("confidence", 0.0)
-        
-        logger.info(f"LLM classified intent as: {llm_intent} (confidence: {confidence})")
-        
-        # Map LLM intent to simplified routing categories
-        if llm_intent == "provide_birth_data":
-            logger.info("Intent detected: birth_input")
-            return "birth_input"
-        elif llm_intent == "change_profile":
-            logger.info("Intent detected: change_profile")
-            return "change_profile"
-        else:
-            # All other intents default to natal_question
-            # This includes: ask_about_chart, ask_general_question, meta_conversation,
-            # clarify_birth_data, new_profile_request, unknown
-            # Note: ask_transit_question is also mapped to natal_question (transit functionality disabled)
-            logger.info(f"Intent detected: natal_question (mapped from {llm_intent})")
-            return "natal_question"
-            
+        return _route_intent(classify_intent(user_text))
+    
     except Exception as e:
         logger.exception(f"Error in LLM intent detection: {e}")
         # Fallback to natal_question on error
@@ -86,24 +97,8 @@ async def detect_request_type_async(user_text: str) -> IntentType:
     
     try:
         # Use async LLM to classify intent
-        intent_result = await classify_intent_async(user_text)
-        llm_intent = intent_result.get("intent", "unknown")
-        confidence = intent_result.get("confidence", 0.0)
-        
-        logger.info(f"LLM classified intent as: {llm_intent} (confidence: {confidence})")
-        
-        # Map LLM intent to simplified routing categories
-        if llm_intent == "provide_birth_data":
-            logger.info("Intent detected: birth_input")
-            return "birth_input"
-        elif llm_intent == "change_profile":
-            logger.info("Intent detected: change_profile")
-            return "change_profile"
-        else:
-            # All other intents default to natal_question
-            logger.info(f"Intent detected: natal_question (mapped from {llm_intent})")
-            return "natal_question"
-            
+        return _route_intent(await classify_intent_async(user_text))
+    
     except Exception as e:
         logger.exception(f"Error in LLM intent detection: {e}")
         # Fallback to natal_question on error
@@ -3,17 +3,19 @@ Transit calculations using Kerykeion library.
 Calculates current or future transits relative to natal chart.
 """
 
+import asyncio
 import logging
 import re
 from datetime import datetime, timezone
 from typing import Dict, Any
 from kerykeion import AstrologicalSubject
-from timezonefinder import TimezoneFinder
+from src.services.chart_builder import get_timezone_cached
 
 logger = logging.getLogger(__name__)
 
-# Initialize TimezoneFinder once at module level
-_timezone_finder = TimezoneFinder()
+# Coordinates embedded in natal chart original_input ("... Lat: 40.7128, Lng: -74.0060")
+LAT_PATTERN = re.compile(r'Lat:\s*([-+]?\d+\.?\d*)')
+LNG_PATTERN = re.compile(r'Lng:\s*([-+]?\d+\.?\d*)')
 
 # Planet names (lowercase for Kerykeion attribute access)
 PLANET_ATTRS = ['sun', 'moon', 'mercury', 'venus', 'mars', 
@@ -85,8 +87,8 @@ def build_transits(
         original_input = natal_chart_json.get("original_input", "")
         
         # Try to extract coordinates from original_input
-        lat_match = re.search(r'Lat:\s*([-+]?\d+\.?\d*)', original_input)
-        lng_match = re.search(r'Lng:\s*([-+]?\d+\.?\d*)', original_input)
+        lat_match = LAT_PATTERN.search(original_input)
+        lng_match = LNG_PATTERN.search(original_input)
         
         if not lat_match or not lng_match:
             logger.error("Could not extract coordinates from natal chart")
@@ -96,7 +98,7 @@ def build_transits(
         birth_lng = float(lng_match.group(1))
         
         # Determine timezone for transit date
-        tz_str = _timezone_finder.timezone_at(lat=birth_lat, lng=birth_lng)
+        tz_str = get_timezone_cached(birth_lat, birth_lng)
         if not tz_str:
             tz_str = "UTC"
             logger.warning("Could not determine timezone, using UTC")
@@ -181,6 +183,22 @@ def build_transits(
         raise Exception(f"Failed to calculate transits: {str(e)}")
 
 
+async def build_transits_async(
+    natal_chart_json: dict,
+    transit_date: datetime
+) -> Dict[str, Any]:
+    """
+    Async version of build_transits that runs in thread pool executor.
+    
+    Kerykeion's ephemeris calculation is CPU-bound, so running it off the
+    event loop keeps other users' webhooks responsive meanwhile.
+    
+    See build_transits() for full documentation.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, build_transits, natal_chart_json, transit_date)
+
+
 def format_transits_for_llm(transits: Dict[str, Any]) -> str:
     """
     Format transit data as readable text for LLM.
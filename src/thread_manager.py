@@ -9,8 +9,8 @@ Manages conversation threads for users with the following rules:
 """
 
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import case, delete, func, insert, select
 from sqlalchemy.orm import Session
 from src.models import ConversationMessage
 
@@ -20,11 +20,14 @@ logger = logging.getLogger(__name__)
 MAX_THREAD_LENGTH = 10
 FIXED_PAIR_COUNT = 2  # First user message + first assistant response
 
+# Writes go through Core statements on the table, skipping the ORM unit of work
+_messages_table = ConversationMessage.__table__
 
-def add_message_to_thread(session: Session, telegram_id: str, role: str, content: str) -> ConversationMessage:
+
+def add_message_to_thread(session: Session, telegram_id: int, role: str, content: str) -> int:
     """
     Add a message to the user's conversation thread.
-    Automatically marks first pair and trims thread if needed.
+    Automatically trims thread if needed.
     
     Args:
         session: Database session
@@ -33,7 +36,7 @@ def add_message_to_thread(session: Session, telegram_id: str, role: str, content
         content: Message text or summary
         
     Returns:
-        Created ConversationMessage object
+        ID of the created message
         
     Raises:
         ValueError: If role is not "user" or "assistant"
@@ -50,42 +53,27 @@ def add_message_to_thread(session: Session, telegram_id: str, role: str, content
     )
     
     try:
-        # Check if this is part of the first pair without loading all messages
-        base_query = session.query(ConversationMessage).filter_by(telegram_id=telegram_id)
-        message_count = base_query.count()
-
-        # Determine if this message is part of the first pair
-        is_first_pair = False
-        if message_count == 0 and role == "user":
-            # First user message
-            is_first_pair = True
-        elif message_count == 1 and role == "assistant":
-            # First assistant response (after first user message)
-            first_message = base_query.order_by(ConversationMessage.created_at).first()
-            if first_message and first_message.role == "user":
-                is_first_pair = True
-        
-        # Create new message
-        new_message = ConversationMessage(
-            telegram_id=telegram_id,
-            role=role,
-            content=content,
-            is_first_pair=is_first_pair,
-            created_at=datetime.now(timezone.utc)
-        )
+        # Fetch the existing thread once; it is small (bounded by MAX_THREAD_LENGTH)
+        # and gives the trim candidates
+        thread_rows = _fetch_thread_rows(session, telegram_id)
         
-        session.add(new_message)
-        session.flush()  # Flush to get the ID without committing
+        # Insert the new message; the column default stamps created_at in UTC and
+        # RETURNING gives a row shaped like the fetched ones
+        new_row = session.execute(
+            insert(_messages_table)
+            .values(telegram_id=telegram_id, role=role, content=content)
+            .returning(_messages_table.c.id, _messages_table.c.role)
+        ).one()
         
-        logger.info("Message added to thread: id=%s, is_first_pair=%s", new_message.id, is_first_pair)
+        logger.info("Message added to thread: id=%s", new_row.id)
         
-        # Trim thread if needed (in same transaction)
-        trim_thread_if_needed(session, telegram_id)
+        # Trim thread if needed (in same transaction), reusing the rows fetched above
+        trim_thread_if_needed(session, telegram_id, thread_rows + [new_row])
         
         # Commit both the insert and any trimming together
         session.commit()
         
-        return new_message
+        return new_row.id
         
     except Exception as e:
         logger.exception("Error adding message to thread for %s: %s", telegram_id, e)
@@ -93,7 +81,44 @@ def add_message_to_thread(session: Session, telegram_id: str, role: str, content
         raise
 
 
-def get_conversation_thread(session: Session, telegram_id: str) -> List[Dict[str, str]]:
+def fetch_recent_messages(
+    session: Session,
+    telegram_id: int,
+    limit: Optional[int] = MAX_THREAD_LENGTH
+) -> Tuple[List[str], List[str]]:
+    """
+    Fetch the most recent thread messages as parallel role/content lists.
+    
+    Selects only the role and content columns, so rows come back as plain
+    tuples instead of hydrated ConversationMessage instances.
+    
+    Args:
+        session: Database session
+        telegram_id: User's Telegram ID
+        limit: Maximum number of most recent messages to return
+               (None returns the whole thread)
+        
+    Returns:
+        Tuple of (roles, contents), ordered chronologically (oldest first)
+    """
+    stmt = select(ConversationMessage.role, ConversationMessage.content)\
+        .where(ConversationMessage.telegram_id == telegram_id)
+    
+    if limit is None:
+        stmt = stmt.order_by(ConversationMessage.created_at, ConversationMessage.id)
+        rows = session.execute(stmt).all()
+    else:
+        stmt = stmt.order_by(ConversationMessage.created_at.desc(), ConversationMessage.id.desc())\
+            .limit(limit)
+        rows = session.execute(stmt).all()
+        rows.reverse()
+    
+    roles = [row[0] for row in rows]
+    contents = [row[1] for row in rows]
+    return roles, contents
+
+
+def get_conversation_thread(session: Session, telegram_id: int) -> List[Dict[str, str]]:
     """
     Retrieve the current conversation thread for a user.
     
@@ -105,39 +130,60 @@ def get_conversation_thread(session: Session, telegram_id: str) -> List[Dict[str
         List of message dictionaries with 'role' and 'content' keys,
         ordered chronologically (oldest first)
     """
-    logger.debug(f"Retrieving conversation thread for telegram_id={telegram_id}")
+    logger.debug("Retrieving conversation thread for telegram_id=%s", telegram_id)
     
     try:
-        messages = session.query(ConversationMessage)\
-            .filter_by(telegram_id=telegram_id)\
-            .order_by(ConversationMessage.created_at)\
-            .all()
+        roles, contents = fetch_recent_messages(session, telegram_id, limit=None)
         
         thread = [
             {
-                "role": msg.role,
-                "content": msg.content
+                "role": role,
+                "content": content
             }
-            for msg in messages
+            for role, content in zip(roles, contents)
         ]
         
-        logger.info(f"Retrieved {len(thread)} messages from thread for {telegram_id}")
+        logger.info("Retrieved %d messages from thread for %s", len(thread), telegram_id)
         
         return thread
         
     except Exception as e:
-        logger.exception(f"Error retrieving conversation thread for {telegram_id}: {e}")
+        logger.exception("Error retrieving conversation thread for %s: %s", telegram_id, e)
         raise
 
 
-def trim_thread_if_needed(session: Session, telegram_id: str):
+def _fetch_thread_rows(session: Session, telegram_id: int) -> list:
+    """
+    Fetch the id and role of every message in a user's thread.
+    
+    Args:
+        session: Database session
+        telegram_id: User's Telegram ID
+        
+    Returns:
+        List of rows with id and role attributes,
+        ordered chronologically (oldest first)
+    """
+    return session.query(
+        ConversationMessage.id,
+        ConversationMessage.role
+    ).filter_by(telegram_id=telegram_id)\
+        .order_by(ConversationMessage.created_at, ConversationMessage.id)\
+        .all()
+
+
+def trim_thread_if_needed(session: Session, telegram_id: int, messages: Optional[list] = None):
     """
     Trim thread to MAX_THREAD_LENGTH if exceeded.
-    Keeps first pair fixed, removes oldest non-fixed messages (FIFO).
+    Keeps first pair (the FIXED_PAIR_COUNT oldest messages) fixed,
+    removes oldest non-fixed messages (FIFO).
     
     Args:
         session: Database session
         telegram_id: User's Telegram ID
+        messages: The thread's messages (anything with id and role attributes),
+                  ordered chronologically. When omitted, a bounded count is checked
+                  first and the rows are only fetched if trimming is needed.
         
     Raises:
         ValueError: If thread cannot be trimmed to MAX_THREAD_LENGTH due to
@@ -146,11 +192,16 @@ def trim_thread_if_needed(session: Session, telegram_id: str):
     logger.debug("Checking if thread needs trimming for telegram_id=%s", telegram_id)
     
     try:
-        # Get all messages ordered by creation time
-        messages = session.query(ConversationMessage)\
-            .filter_by(telegram_id=telegram_id)\
-            .order_by(ConversationMessage.created_at)\
-            .all()
+        if messages is None:
+            # Bounded count first, so an under-limit thread is never materialized
+            bounded_count = session.query(ConversationMessage.id)\
+                .filter_by(telegram_id=telegram_id)\
+                .limit(MAX_THREAD_LENGTH + 1)\
+                .count()
+            if bounded_count <= MAX_THREAD_LENGTH:
+                logger.debug("Thread size OK: %d/%d", bounded_count, MAX_THREAD_LENGTH)
+                return
+            messages = _fetch_thread_rows(session, telegram_id)
         
         message_count = len(messages)
         
@@ -168,22 +219,23 @@ def trim_thread_if_needed(session: Session, telegram_id: str):
             messages_to_delete
         )
         
-        # Separate non-fixed messages
-        non_fixed_messages = [msg for msg in messages if not msg.is_first_pair]
+        # Messages are ordered chronologically, so the first pair is always the head
+        non_fixed_messages = messages[FIXED_PAIR_COUNT:]
         deletable_count = len(non_fixed_messages)
         
         # Determine how many messages we can actually delete
         actual_delete_count = min(deletable_count, messages_to_delete)
         
-        # Delete oldest non-fixed messages (FIFO)
+        # Delete oldest non-fixed messages (FIFO) in a single statement
+        delete_ids = []
         for msg in non_fixed_messages[:actual_delete_count]:
-            logger.debug(
-                "Deleting message: id=%s, role=%s, created_at=%s",
-                msg.id,
-                msg.role,
-                msg.created_at
+            logger.debug("Deleting message: id=%s, role=%s", msg.id, msg.role)
+            delete_ids.append(msg.id)
+        
+        if delete_ids:
+            session.execute(
+                delete(_messages_table).where(_messages_table.c.id.in_(delete_ids))
             )
-            session.delete(msg)
         
         # Compute remaining messages after attempted deletion
         remaining_count = message_count - actual_delete_count
@@ -225,7 +277,7 @@ def trim_thread_if_needed(session: Session, telegram_id: str):
         raise
 
 
-def reset_thread(session: Session, telegram_id: str):
+def reset_thread(session: Session, telegram_id: int):
     """
     Reset (clear) the entire conversation thread for a user.
     
@@ -237,9 +289,9 @@ def reset_thread(session: Session, telegram_id: str):
     
     try:
         # Delete all messages for this user
-        deleted_count = session.query(ConversationMessage)\
-            .filter_by(telegram_id=telegram_id)\
-            .delete()
+        deleted_count = session.execute(
+            delete(_messages_table).where(_messages_table.c.telegram_id == telegram_id)
+        ).rowcount
         
         session.commit()
         
@@ -253,7 +305,7 @@ def reset_thread(session: Session, telegram_id: str):
         raise
 
 
-def get_thread_summary(session: Session, telegram_id: str) -> Dict[str, Any]:
+def get_thread_summary(session: Session, telegram_id: int) -> Dict[str, Any]:
     """
     Get summary statistics about the user's thread.
     Useful for debugging and analytics.
@@ -268,18 +320,22 @@ def get_thread_summary(session: Session, telegram_id: str) -> Dict[str, Any]:
     logger.debug(f"Getting thread summary for telegram_id={telegram_id}")
     
     try:
-        messages = session.query(ConversationMessage)\
-            .filter_by(telegram_id=telegram_id)\
-            .order_by(ConversationMessage.created_at)\
-            .all()
+        # One aggregate query; no message rows are loaded into Python
+        total, user_count, assistant_count, oldest, newest = session.query(
+            func.count(ConversationMessage.id),
+            func.coalesce(func.sum(case((ConversationMessage.role == "user", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((ConversationMessage.role == "assistant", 1), else_=0)), 0),
+            func.min(ConversationMessage.created_at),
+            func.max(ConversationMessage.created_at)
+        ).filter_by(telegram_id=telegram_id).one()
         
         summary = {
-            "total_messages": len(messages),
-            "fixed_messages": sum(1 for msg in messages if msg.is_first_pair),
-            "user_messages": sum(1 for msg in messages if msg.role == "user"),
-            "assistant_messages": sum(1 for msg in messages if msg.role == "assistant"),
-            "oldest_message": messages[0].created_at if messages else None,
-            "newest_message": messages[-1].created_at if messages else None
+            "total_messages": total,
+            "fixed_messages": min(total, FIXED_PAIR_COUNT),
+            "user_messages": user_count,
+            "assistant_messages": assistant_count,
+            "oldest_message": oldest,
+            "newest_message": newest
         }
         
         logger.debug(f"Thread summary: {summary}")
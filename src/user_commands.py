@@ -13,7 +13,7 @@ from src.models import STATE_AWAITING_BIRTH_DATA, STATE_AWAITING_CONFIRMATION, S
 logger = logging.getLogger(__name__)
 
 
-async def handle_my_data_command(telegram_id: str, send_message_func) -> bool:
+async def handle_my_data_command(telegram_id: int, send_message_func) -> bool:
     """
     Handle /my_data command - Show user their birth data.
     
@@ -123,7 +123,7 @@ async def handle_my_data_command(telegram_id: str, send_message_func) -> bool:
         return True
 
 
-async def handle_my_chart_raw_command(telegram_id: str, send_message_func) -> bool:
+async def handle_my_chart_raw_command(telegram_id: int, send_message_func) -> bool:
     """
     Handle /my_chart_raw command - Return raw natal chart data.
     
@@ -207,7 +207,7 @@ async def handle_my_chart_raw_command(telegram_id: str, send_message_func) -> bo
         return True
 
 
-async def handle_my_readings_command(telegram_id: str, send_message_func, reading_id: str = None) -> bool:
+async def handle_my_readings_command(telegram_id: int, send_message_func, reading_id: str = None) -> bool:
     """
     Handle /my_readings command - List all user readings or retrieve specific reading.
     
@@ -307,7 +307,7 @@ async def handle_my_readings_command(telegram_id: str, send_message_func, readin
         return True
 
 
-async def handle_edit_birth_command(telegram_id: str, send_message_func) -> bool:
+async def handle_edit_birth_command(telegram_id: int, send_message_func) -> bool:
     """
     Handle /edit_birth command - Start flow to edit birth data.
     
@@ -370,7 +370,7 @@ async def handle_edit_birth_command(telegram_id: str, send_message_func) -> bool
         return True
 
 
-async def handle_user_command(telegram_id: str, command: str, send_message_func) -> bool:
+async def handle_user_command(telegram_id: int, command: str, send_message_func) -> bool:
     """
     Handle user transparency commands. Returns True if command was handled.
     
@@ -403,7 +403,7 @@ async def handle_user_command(telegram_id: str, command: str, send_message_func)
     return False
 
 
-async def handle_help_command(telegram_id: str, send_message_func) -> bool:
+async def handle_help_command(telegram_id: int, send_message_func) -> bool:
     """
     Handle /help command - Show available commands.
     
@@ -449,7 +449,7 @@ async def handle_help_command(telegram_id: str, send_message_func) -> bool:
         return True
 
 
-async def handle_upload_chart_command(telegram_id: str, send_message_func) -> bool:
+async def handle_upload_chart_command(telegram_id: int, send_message_func) -> bool:
     """
     Handle /upload_chart command - Start flow to upload a chart.
     
@@ -6,10 +6,16 @@ This profile captures user preferences, communication style, interests, and cont
 Max length: one Telegram message (~4096 characters).
 """
 
+import asyncio
 import logging
-import json
-from typing import List, Dict, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set, Tuple
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
+from src.db import SessionLocal
 from src.models import User
 
 logger = logging.getLogger(__name__)
@@ -17,11 +23,109 @@ logger = logging.getLogger(__name__)
 # Maximum profile length (Telegram message limit)
 MAX_PROFILE_LENGTH = 4000  # Leave some buffer below 4096
 
+# In-process LRU cache of profile reads, keyed by telegram_id.
+# update_user_profile() refreshes the entry; the TTL bounds staleness from any other writer.
+PROFILE_CACHE_SIZE = 4096
+PROFILE_CACHE_TTL_SECONDS = 300
+_profile_cache: "OrderedDict[int, Tuple[float, Optional[str]]]" = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+# Profile rewrites are LLM calls; bound how many run in the background at once
+PROFILE_UPDATE_CONCURRENCY = 8
+# One semaphore per event loop: asyncio primitives are bound to the loop that first uses them
+_profile_update_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_background_tasks: Set[asyncio.Task] = set()  # Keeps scheduled tasks referenced until done
+
+# Rapid-fire turns are coalesced: a user gets at most one profile rewrite per
+# interval, and none while one is already running. A skipped turn's text is not
+# sent to the LLM; it only reaches the profile if a later turn, scheduled after
+# the interval, still has it in the conversation history it reads.
+PROFILE_UPDATE_MIN_INTERVAL_SECONDS = 60
+_pending_profile_updates: Set[int] = set()
+# telegram_id -> time.monotonic() of last scheduled update, oldest first; entries
+# past the interval no longer debounce anything and are pruned from the front
+_last_profile_update: "OrderedDict[int, float]" = OrderedDict()
+
+# Acknowledgements carry no profiling signal, so they never trigger a rewrite
+TRIVIAL_MESSAGE_MAX_LENGTH = 15
+TRIVIAL_MESSAGES = frozenset({
+    "ок", "окей", "ok", "okay", "да", "нет", "ага", "угу", "ясно", "понятно",
+    "хорошо", "спасибо", "спс", "благодарю", "супер", "класс",
+    "yes", "no", "thanks", "thank you", "thx", "cool", "+", "👍",
+})
+
+# Profile reads only need the one column, so no User instance is built
+_PROFILE_SELECT = select(User.user_profile).where(User.telegram_id == bindparam("tid"))
+
+
+def _cache_profile(telegram_id: int, profile: Optional[str]) -> None:
+    """
+    Store a profile read in the cache, evicting the least recently used entry if full.
+    
+    Args:
+        telegram_id: User's Telegram ID
+        profile: Profile document, or None if the user has none
+    """
+    with _profile_cache_lock:
+        _profile_cache[telegram_id] = (time.monotonic() + PROFILE_CACHE_TTL_SECONDS, profile)
+        _profile_cache.move_to_end(telegram_id)
+        if len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+
+
+def clear_profile_cache() -> None:
+    """Clear the profile cache (useful for testing)."""
+    with _profile_cache_lock:
+        _profile_cache.clear()
+
+# Fixed parts and section templates of the profile update prompt
+PROFILE_PROMPT_HEADER = """You are maintaining a dynamic user profile for an astrology bot conversation.
+
+Your task: Update the user profile document based on the latest interaction.
+
+The profile should capture:
+- User's communication style (brief/detailed, emotional/analytical, direct/exploratory)
+- Topics of interest (career, relationships, personal growth, spirituality, etc.)
+- Recurring questions or concerns
+- Emotional patterns or states
+- Preferences in how they like information presented
+- Any context that helps provide better responses
+
+IMPORTANT: Keep the profile concise (max 4000 characters).
+Format: Natural paragraphs in Russian.
+Focus on what's useful for tailoring future responses.
+
+"""
+PROFILE_PROMPT_CURRENT_TEMPLATE = "CURRENT PROFILE:\n{profile}\n\n"
+PROFILE_PROMPT_NO_CURRENT = "CURRENT PROFILE: None (this is the first interaction)\n\n"
+PROFILE_PROMPT_LATEST_TEMPLATE = "LATEST INTERACTION:\nUser: {user}\nAssistant: {assistant}\n\n"
+PROFILE_PROMPT_FOOTER = """Now provide the UPDATED USER PROFILE in Russian. 
+Write naturally, focusing on insights that will help personalize future responses.
+If this is the first interaction, create an initial profile based on what you learned.
+"""
+
+
+def _shorten(text: str, limit: int) -> str:
+    """
+    Truncate text to limit characters with a trailing "...", returning short text as is.
+    
+    Args:
+        text: Text to shorten
+        limit: Maximum number of characters kept from text
+        
+    Returns:
+        text itself if it fits, otherwise its first limit characters plus "..."
+    """
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
 class UserProfileManager:
     """Manages dynamic user profiles that evolve through conversation."""
     
     @staticmethod
-    def get_user_profile(session: Session, telegram_id: str) -> Optional[str]:
+    def get_user_profile(session: Session, telegram_id: int) -> Optional[str]:
         """
         Retrieve the current user profile document.
         
@@ -32,12 +136,18 @@ class UserProfileManager:
         Returns:
             User profile document string, or None if not exists
         """
-        user = session.query(User).filter_by(telegram_id=telegram_id).first()
-        if not user:
-            return None
+        with _profile_cache_lock:
+            cached = _profile_cache.get(telegram_id)
+            if cached is not None:
+                expires_at, profile = cached
+                if expires_at > time.monotonic():
+                    _profile_cache.move_to_end(telegram_id)
+                    return profile
+                del _profile_cache[telegram_id]
         
-        # Check if user has a profile attribute (we'll add this to User model)
-        profile = getattr(user, 'user_profile', None)
+        # None both when the user doesn't exist and when they have no profile yet
+        profile = session.execute(_PROFILE_SELECT, {"tid": telegram_id}).scalar_one_or_none()
+        _cache_profile(telegram_id, profile)
         
         if profile:
             logger.debug(f"Retrieved profile for user {telegram_id}: {len(profile)} chars")
@@ -47,7 +157,7 @@ class UserProfileManager:
         return profile
     
     @staticmethod
-    def update_user_profile(session: Session, telegram_id: str, new_profile: str) -> None:
+    def update_user_profile(session: Session, telegram_id: int, new_profile: str) -> None:
         """
         Update the user profile document.
         
@@ -61,14 +171,25 @@ class UserProfileManager:
             logger.warning(f"Profile for {telegram_id} too long ({len(new_profile)} chars), truncating")
             new_profile = new_profile[:MAX_PROFILE_LENGTH]
         
-        user = session.query(User).filter_by(telegram_id=telegram_id).first()
-        if not user:
-            logger.error(f"Cannot update profile: user {telegram_id} not found")
+        # Single UPDATE statement; no SELECT or ORM dirty-checking of the User row.
+        # Rows already holding this profile are not matched, so nothing is written.
+        result = session.execute(
+            update(User)
+            .where(User.telegram_id == telegram_id)
+            .where(User.user_profile.is_distinct_from(new_profile))
+            .values(user_profile=new_profile)
+        )
+        if result.rowcount == 0:
+            # Either the user doesn't exist or the profile is unchanged; no commit either way
+            if session.get(User, telegram_id) is None:
+                logger.error(f"Cannot update profile: user {telegram_id} not found")
+                return
+            _cache_profile(telegram_id, new_profile)
+            logger.debug(f"Profile for user {telegram_id} unchanged, skipping write")
             return
         
-        # Update profile attribute
-        user.user_profile = new_profile
         session.commit()
+        _cache_profile(telegram_id, new_profile)
         
         logger.info(f"Updated profile for user {telegram_id}: {len(new_profile)} chars")
     
@@ -91,63 +212,34 @@ class UserProfileManager:
         Returns:
             Formatted prompt for profile update LLM call
         """
-        prompt = """You are maintaining a dynamic user profile for an astrology bot conversation.
-
-Your task: Update the user profile document based on the latest interaction.
-
-The profile should capture:
-- User's communication style (brief/detailed, emotional/analytical, direct/exploratory)
-- Topics of interest (career, relationships, personal growth, spirituality, etc.)
-- Recurring questions or concerns
-- Emotional patterns or states
-- Preferences in how they like information presented
-- Any context that helps provide better responses
-
-IMPORTANT: Keep the profile concise (max 4000 characters).
-Format: Natural paragraphs in Russian.
-Focus on what's useful for tailoring future responses.
-
-"""
+        parts = [PROFILE_PROMPT_HEADER]
         
         if current_profile:
-            prompt += f"""CURRENT PROFILE:
-{current_profile}
-
-"""
+            parts.append(PROFILE_PROMPT_CURRENT_TEMPLATE.format(profile=current_profile))
         else:
-            prompt += """CURRENT PROFILE: None (this is the first interaction)
-
-"""
+            parts.append(PROFILE_PROMPT_NO_CURRENT)
         
-        prompt += f"""LATEST INTERACTION:
-User: {latest_user_message}
-Assistant: {latest_assistant_response[:500]}{'...' if len(latest_assistant_response) > 500 else ''}
-
-"""
+        parts.append(PROFILE_PROMPT_LATEST_TEMPLATE.format(
+            user=latest_user_message,
+            assistant=_shorten(latest_assistant_response, 500)
+        ))
         
         if conversation_history and len(conversation_history) > 2:
-            prompt += """CONVERSATION CONTEXT (last few messages):
-"""
             # Limit to last 4 messages to keep prompt manageable
-            for msg in conversation_history[-4:]:
-                role_label = "Пользователь" if msg["role"] == "user" else "Ассистент"
-                content_preview = msg["content"][:200]
-                if len(msg["content"]) > 200:
-                    content_preview += "..."
-                prompt += f"{role_label}: {content_preview}\n"
-            prompt += "\n"
-        
-        prompt += """Now provide the UPDATED USER PROFILE in Russian. 
-Write naturally, focusing on insights that will help personalize future responses.
-If this is the first interaction, create an initial profile based on what you learned.
-"""
+            history_lines = "\n".join(
+                f"{'Пользователь' if msg['role'] == 'user' else 'Ассистент'}: {_shorten(msg['content'], 200)}"
+                for msg in conversation_history[-4:]
+            )
+            parts.append(f"CONVERSATION CONTEXT (last few messages):\n{history_lines}\n\n")
         
-        return prompt
+        parts.append(PROFILE_PROMPT_FOOTER)
+        
+        return "".join(parts)
 
 
 def update_profile_after_interaction(
     session: Session,
-    telegram_id: str,
+    telegram_id: int,
     conversation_history: List[Dict[str, str]],
     latest_user_message: str,
     latest_assistant_response: str,
@@ -200,3 +292,154 @@ def update_profile_after_interaction(
     except Exception as e:
         logger.exception(f"Error updating profile for user {telegram_id}: {e}")
         # Don't raise - profile update failure shouldn't break the conversation
+
+
+def _update_profile_in_new_session(
+    telegram_id: int,
+    latest_user_message: str,
+    latest_assistant_response: str,
+    call_llm_func=None
+) -> None:
+    """
+    Run update_profile_after_interaction() with its own database session.
+    
+    Background updates outlive the request that scheduled them, so they can't
+    share its session.
+    
+    Args:
+        telegram_id: User's Telegram ID
+        latest_user_message: Most recent user message
+        latest_assistant_response: Most recent assistant response
+        call_llm_func: Optional call_llm function for testing
+    """
+    from src.thread_manager import get_conversation_thread
+    
+    session = SessionLocal()
+    try:
+        # Conversation history now includes the latest exchange
+        conversation_history = get_conversation_thread(session, telegram_id)
+        update_profile_after_interaction(
+            session=session,
+            telegram_id=telegram_id,
+            conversation_history=conversation_history,
+            latest_user_message=latest_user_message,
+            latest_assistant_response=latest_assistant_response,
+            call_llm_func=call_llm_func
+        )
+    except Exception as e:
+        logger.exception(f"Background profile update failed for user {telegram_id}: {e}")
+    finally:
+        session.close()
+
+
+async def update_profile_after_interaction_async(
+    telegram_id: int,
+    latest_user_message: str,
+    latest_assistant_response: str,
+    call_llm_func=None
+) -> None:
+    """
+    Async version of update_profile_after_interaction that runs in a thread pool executor.
+    
+    At most PROFILE_UPDATE_CONCURRENCY updates run at once; the rest wait their turn.
+    See update_profile_after_interaction() for full documentation.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _profile_update_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _profile_update_semaphores[loop] = asyncio.Semaphore(PROFILE_UPDATE_CONCURRENCY)
+    
+    async with semaphore:
+        await loop.run_in_executor(
+            None,
+            _update_profile_in_new_session,
+            telegram_id,
+            latest_user_message,
+            latest_assistant_response,
+            call_llm_func
+        )
+
+
+def is_trivial_message(text: str) -> bool:
+    """
+    Check whether a user message is a bare acknowledgement like "ок" or "спасибо".
+    
+    Args:
+        text: User's message text
+        
+    Returns:
+        True if the message is short and in TRIVIAL_MESSAGES (ignoring case,
+        surrounding whitespace and trailing punctuation)
+    """
+    stripped = text.strip()
+    if len(stripped) >= TRIVIAL_MESSAGE_MAX_LENGTH:
+        return False
+    return stripped.lower().rstrip("!.)") in TRIVIAL_MESSAGES
+
+
+def _prune_last_profile_updates(now: float) -> None:
+    """
+    Drop debounce entries older than PROFILE_UPDATE_MIN_INTERVAL_SECONDS.
+    
+    Entries are kept in scheduling order, so only the expired head is visited.
+    
+    Args:
+        now: Current time.monotonic() reading
+    """
+    threshold = now - PROFILE_UPDATE_MIN_INTERVAL_SECONDS
+    while _last_profile_update:
+        _, scheduled_at = next(iter(_last_profile_update.items()))
+        if scheduled_at > threshold:
+            break
+        _last_profile_update.popitem(last=False)
+
+
+def schedule_profile_update(
+    telegram_id: int,
+    latest_user_message: str,
+    latest_assistant_response: str
+) -> Optional[asyncio.Task]:
+    """
+    Start a background profile update without waiting for it.
+    
+    Skipped for trivial messages (see is_trivial_message()), if an update for
+    this user is already running, or if one was scheduled less than
+    PROFILE_UPDATE_MIN_INTERVAL_SECONDS ago. A skipped turn is dropped, not
+    queued. Must be called from a running event loop (the bookkeeping is only
+    touched from the loop thread).
+    
+    Args:
+        telegram_id: User's Telegram ID
+        latest_user_message: Most recent user message
+        latest_assistant_response: Most recent assistant response
+        
+    Returns:
+        The scheduled task, or None if the update was coalesced away
+    """
+    if is_trivial_message(latest_user_message):
+        logger.debug(f"Trivial message from user {telegram_id}, skipping profile update")
+        return None
+    
+    now = time.monotonic()
+    _prune_last_profile_updates(now)
+    if telegram_id in _pending_profile_updates:
+        logger.debug(f"Profile update for user {telegram_id} already running, skipping")
+        return None
+    last = _last_profile_update.get(telegram_id)
+    if last is not None and now - last < PROFILE_UPDATE_MIN_INTERVAL_SECONDS:
+        logger.debug(f"Profile for user {telegram_id} updated {now - last:.0f}s ago, skipping")
+        return None
+    
+    _pending_profile_updates.add(telegram_id)
+    _last_profile_update[telegram_id] = now
+    _last_profile_update.move_to_end(telegram_id)
+    
+    task = asyncio.create_task(
+        update_profile_after_interaction_async(
+            telegram_id, latest_user_message, latest_assistant_response
+        )
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(lambda _: _pending_profile_updates.discard(telegram_id))
+    return task
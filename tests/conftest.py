@@ -6,39 +6,94 @@ Sets up environment variables and common test fixtures.
 
 import os
 import pytest
-import tempfile
-
-# Create a temporary database file for tests (shared across all test sessions)
-test_db_path = os.path.join(tempfile.gettempdir(), "test_natal_nataly.db")
 
 # Set up minimal environment variables for testing
 # These are required for the src modules to import properly
 os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test_bot_token_12345")
 os.environ.setdefault("LLM_PROVIDER", "groq")
 os.environ.setdefault("GROQ_API_KEY", "test_groq_api_key_12345")
-os.environ.setdefault("DATABASE_URL", f"sqlite:///{test_db_path}")
+# In-memory SQLite: src.db shares one connection (StaticPool) across all sessions
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+# Import the app (and with it Kerykeion and the bot) once, before collection,
+# rather than lazily inside the first test that needs it
+from src.main import app as _app  # noqa: E402
+
+# Opt-in shortcut for the local inner loop: with --skip-unchanged-charts, the
+# (slow) TestChartBuilder tests are skipped while these files are unchanged
+# since a run in which all of them passed
+CHART_BUILDER_FILES = ("src/services/chart_builder.py", "tests/test_chart_builder.py")
+CHART_BUILDER_CACHE_KEY = "natal_nataly/chart_builder_mtimes"
+CHART_BUILDER_TEST_CLASS = "TestChartBuilder"
+
+_chart_results = {"passed": 0, "incomplete": False}
+
+
+def _is_chart_builder_item(nodeid: str) -> bool:
+    return f"::{CHART_BUILDER_TEST_CLASS}::" in nodeid
+
+
+def _chart_builder_mtimes(config) -> list:
+    return [os.path.getmtime(config.rootpath / path) for path in CHART_BUILDER_FILES]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--skip-unchanged-charts",
+        action="store_true",
+        default=False,
+        help="skip TestChartBuilder if the chart builder and its tests are unchanged since they last all passed",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    cache = getattr(config, "cache", None)
+    if not config.getoption("skip_unchanged_charts") or cache is None:
+        return
+    if cache.get(CHART_BUILDER_CACHE_KEY, None) != _chart_builder_mtimes(config):
+        return
+    
+    skip = pytest.mark.skip(reason="chart builder unchanged since last passing run")
+    for item in items:
+        if _is_chart_builder_item(item.nodeid):
+            item.add_marker(skip)
+
+
+def pytest_deselected(items):
+    if any(_is_chart_builder_item(item.nodeid) for item in items):
+        _chart_results["incomplete"] = True
+
+
+def pytest_runtest_logreport(report):
+    if not _is_chart_builder_item(report.nodeid):
+        return
+    if report.failed or report.skipped:
+        _chart_results["incomplete"] = True
+    elif report.when == "call":
+        _chart_results["passed"] += 1
+
+
+def pytest_sessionfinish(session, exitstatus):
+    cache = getattr(session.config, "cache", None)
+    if cache is None or _chart_results["incomplete"] or not _chart_results["passed"]:
+        return
+    cache.set(CHART_BUILDER_CACHE_KEY, _chart_builder_mtimes(session.config))
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
     """Initialize database tables for testing."""
-    from src.db import init_db, engine
-    from src.models import Base
-    
-    # Remove old test database if it exists
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+    from src.db import init_db
     
-    # Drop all tables first to ensure clean state
-    Base.metadata.drop_all(bind=engine)
-    # Initialize database tables
+    # The in-memory database starts empty and disappears with the process
     init_db()
     yield
-    # Clean up after all tests
-    Base.metadata.drop_all(bind=engine)
-    # Remove test database file
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI application under test."""
+    return _app
 
 
 @pytest.fixture(scope="session")
@@ -122,3 +122,28 @@ class TestBotHelperFunctions:
         
         assert STATE_AWAITING_BIRTH_DATA is not None
         assert STATE_HAS_CHART is not None
+
+    @pytest.mark.parametrize("dob", ["2023-02-29", "1990-02-31", "1990-13-01"])
+    def test_generate_natal_chart_rejects_impossible_dates(self, dob):
+        """Test that impossible birth dates fail before the chart is computed."""
+        from unittest.mock import patch
+        from src.bot import generate_natal_chart_kerykeion
+        
+        birth_data = {"dob": dob, "time": "12:00", "lat": 55.75, "lng": 37.62}
+        with patch('src.bot.build_natal_chart_text_and_json') as mock_build:
+            with pytest.raises(Exception, match="Failed to generate natal chart"):
+                generate_natal_chart_kerykeion(birth_data)
+            mock_build.assert_not_called()
+
+    def test_generate_natal_chart_accepts_unpadded_dob(self):
+        """Test that a dob without zero-padding reaches the chart builder."""
+        from unittest.mock import patch
+        from src.bot import generate_natal_chart_kerykeion
+        
+        birth_data = {"dob": "1990-5-3", "time": "9:05", "lat": 55.75, "lng": 37.62}
+        with patch('src.bot.build_natal_chart_text_and_json') as mock_build:
+            generate_natal_chart_kerykeion(birth_data)
+        
+        kwargs = mock_build.call_args.kwargs
+        assert (kwargs["year"], kwargs["month"], kwargs["day"]) == (1990, 5, 3)
+        assert (kwargs["hour"], kwargs["minute"]) == (9, 5)
@@ -15,16 +15,74 @@ from src.services.chart_builder import (
 )
 
 
+# Inputs sit a quarter-minute past each whole (degree, minute) pair, so the
+# expected value is known by construction and float rounding can't flip a digit
+DMS_CASES = [
+    (deg + (minute + 0.25) / 60, f"{deg}°{minute:02d}'")
+    for deg in (0, 1, 9, 10, 29, 30, 89, 90, 179, 180, 269, 358, 359)
+    for minute in range(60)
+]
+
+NY_BIRTH_KWARGS = dict(
+    name="Test User",
+    year=1990,
+    month=1,
+    day=15,
+    hour=14,
+    minute=30,
+    lat=40.7128,
+    lng=-74.0060,
+    city="New York",
+    nation="USA"
+)
+
+
+@pytest.fixture(scope="module")
+def ny_chart():
+    """Natal chart for a known New York birth, computed once per module."""
+    return build_natal_chart_text_and_json(**NY_BIRTH_KWARGS)
+
+
+@pytest.fixture(scope="module", params=[
+    (51.5074, -0.1278, "London", "UK"),
+    (35.6762, 139.6503, "Tokyo", "Japan"),
+    (-33.8688, 151.2093, "Sydney", "Australia"),
+], ids=lambda loc: loc[2])
+def location_chart(request):
+    """Natal chart for the same birth moment at one of several locations."""
+    lat, lng, city, nation = request.param
+    return build_natal_chart_text_and_json(
+        name="Test User",
+        year=1985,
+        month=6,
+        day=21,
+        hour=8,
+        minute=0,
+        lat=lat,
+        lng=lng,
+        city=city,
+        nation=nation
+    )
+
+
 @pytest.mark.unit
 class TestChartBuilder:
     """Tests for chart generation functions."""
 
-    def test_deg_to_dms_conversion(self):
+    @pytest.mark.parametrize("degrees,expected", [
+        (15.5, "15°30'"),
+        (0.0, "0°00'"),
+        (359.99, "359°59'"),
+        (10.25, "10°15'"),
+    ])
+    def test_deg_to_dms_conversion(self, degrees, expected):
         """Test decimal degrees to degrees/minutes/seconds conversion."""
-        assert deg_to_dms(15.5) == "15°30'"
-        assert deg_to_dms(0.0) == "0°00'"
-        assert deg_to_dms(359.99) == "359°59'"
-        assert deg_to_dms(10.25) == "10°15'"
+        assert deg_to_dms(degrees) == expected
+
+    @pytest.mark.parametrize("degrees,expected", DMS_CASES)
+    def test_deg_to_dms_every_minute(self, degrees, expected):
+        """Test that every whole minute across the zodiac is formatted correctly."""
+        assert deg_to_dms(degrees) == expected
 
     def test_house_suffix(self):
         """Test ordinal suffix generation for house numbers."""
@@ -35,21 +93,9 @@ class TestChartBuilder:
         assert house_suffix(11) == "th"
         assert house_suffix(12) == "th"
 
-    def test_build_natal_chart_basic(self):
+    def test_build_natal_chart_basic(self, ny_chart):
         """Test basic natal chart generation."""
-        # Test with known birth data
-        result = build_natal_chart_text_and_json(
-            name="Test User",
-            year=1990,
-            month=1,
-            day=15,
-            hour=14,
-            minute=30,
-            lat=40.7128,
-            lng=-74.0060,
-            city="New York",
-            nation="USA"
-        )
+        result = ny_chart
         
         # Verify chart text is generated
         assert isinstance(result, dict)
@@ -80,32 +126,14 @@ class TestChartBuilder:
         assert "Sun" in planet_names
         assert "Moon" in planet_names
 
-    def test_build_natal_chart_with_different_locations(self):
+    def test_build_natal_chart_with_different_locations(self, location_chart):
         """Test chart generation with different geographic locations."""
-        locations = [
-            (51.5074, -0.1278, "London", "UK"),  # London
-            (35.6762, 139.6503, "Tokyo", "Japan"),  # Tokyo
-            (-33.8688, 151.2093, "Sydney", "Australia")  # Sydney
-        ]
+        result = location_chart
         
-        for lat, lng, city, nation in locations:
-            result = build_natal_chart_text_and_json(
-                name="Test User",
-                year=1985,
-                month=6,
-                day=21,
-                hour=8,
-                minute=0,
-                lat=lat,
-                lng=lng,
-                city=city,
-                nation=nation
-            )
-            
-            assert isinstance(result, dict)
-            assert "text_export" in result
-            assert "chart_json" in result
-            assert len(result["text_export"]) > 0
+        assert isinstance(result, dict)
+        assert "text_export" in result
+        assert "chart_json" in result
+        assert len(result["text_export"]) > 0
 
     def test_build_natal_chart_invalid_date(self):
         """Test chart generation with invalid date."""
@@ -124,18 +152,31 @@ class TestChartBuilder:
     def test_build_natal_chart_timezone_handling(self):
         """Test chart generation with explicit timezone."""
         result = build_natal_chart_text_and_json(
-            name="Test User",
-            year=1990,
-            month=1,
-            day=15,
-            hour=14,
-            minute=30,
-            lat=40.7128,
-            lng=-74.0060,
-            city="New York",
-            nation="USA",
+            **NY_BIRTH_KWARGS,
             tz_str="America/New_York"
         )
         
         assert isinstance(result, dict)
         assert result["chart_json"]["meta"]["timezone"] == "America/New_York"
+
+    def test_build_natal_chart_repeat_call_returns_independent_copy(self):
+        """Test that repeated charts are equal but mutating one does not affect the next."""
+        kwargs = dict(
+            name="Test User",
+            year=1992,
+            month=3,
+            day=8,
+            hour=9,
+            minute=15,
+            lat=48.8566,
+            lng=2.3522,
+            city="Paris",
+            nation="France"
+        )
+        
+        first = build_natal_chart_text_and_json(**kwargs)
+        first["chart_json"]["planets"].clear()
+        
+        second = build_natal_chart_text_and_json(**kwargs)
+        assert len(second["chart_json"]["planets"]) == 10
+        assert second["text_export"] == first["text_export"]
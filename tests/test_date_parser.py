@@ -0,0 +1,60 @@
+"""
+Unit tests for transit date parsing (services/date_parser.py).
+
+Tests the deterministic fast path and the LLM fallback.
+"""
+
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from src.services.date_parser import parse_transit_date
+
+
+@pytest.mark.unit
+class TestParseTransitDate:
+    """Tests for parse_transit_date."""
+
+    @patch('src.services.date_parser.extract_transit_date')
+    def test_iso_date_skips_llm(self, mock_extract):
+        """Test that an ISO date is parsed without calling the LLM."""
+        result = parse_transit_date(" 2025-03-14 ")
+        
+        assert result == datetime(2025, 3, 14, 12, 0, tzinfo=timezone.utc)
+        mock_extract.assert_not_called()
+
+    @patch('src.services.date_parser.extract_transit_date')
+    def test_relative_keyword_skips_llm(self, mock_extract):
+        """Test that bare relative keywords are resolved without calling the LLM."""
+        result = parse_transit_date("Завтра")
+        
+        expected = datetime.now(timezone.utc) + timedelta(days=1)
+        assert abs(result - expected) < timedelta(seconds=5)
+        mock_extract.assert_not_called()
+
+    @patch('src.services.date_parser.extract_transit_date')
+    def test_free_text_falls_back_to_llm(self, mock_extract):
+        """Test that other text is still sent to the LLM."""
+        mock_extract.return_value = {"date": "2025-06-01"}
+        
+        result = parse_transit_date("какие транзиты будут первого июня?")
+        
+        assert result == datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+        mock_extract.assert_called_once()
+
+    @patch('src.services.date_parser.extract_transit_date')
+    def test_unpadded_llm_date_is_parsed(self, mock_extract):
+        """Test that an LLM reply without zero-padding still resolves to that date."""
+        mock_extract.return_value = {"date": "2025-3-5"}
+        
+        result = parse_transit_date("транзиты на пятое марта")
+        
+        assert result == datetime(2025, 3, 5, 12, 0, tzinfo=timezone.utc)
+
+    @patch('src.services.date_parser.extract_transit_date')
+    def test_invalid_iso_date_falls_back_to_llm(self, mock_extract):
+        """Test that an impossible ISO-looking date is left to the LLM."""
+        mock_extract.return_value = {"date": None}
+        
+        parse_transit_date("2024-02-30")
+        
+        mock_extract.assert_called_once()
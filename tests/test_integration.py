@@ -7,22 +7,31 @@ Tests the integration with Telegram Bot API using mocked HTTP requests:
 - API error handling
 """
 
+import asyncio
+import json
+
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi.testclient import TestClient
 import httpx
 
+from src.bot import send_telegram_message
+
+# Longer than Telegram's 4096-character limit, so it is sent as two chunks
+LONG_TEXT = "a" * 5000
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    """FastAPI test client shared by the module; startup/shutdown run once."""
+    with TestClient(app) as test_client:
+        yield test_client
+
 
 @pytest.mark.integration
 class TestTelegramIntegration:
     """Tests for Telegram API integration."""
 
-    @pytest.fixture
-    def client(self):
-        """Create FastAPI test client."""
-        from src.main import app
-        return TestClient(app)
-
     @pytest.fixture
     def mock_telegram_update(self):
         """Create a mock Telegram update message."""
@@ -47,6 +56,15 @@ class TestTelegramIntegration:
             }
         }
 
+    @pytest.fixture
+    def telegram_mocks(self):
+        """Patch the bot's Telegram sender and DB session factory."""
+        with patch('src.bot.send_telegram_message') as mock_send, \
+                patch('src.bot.SessionLocal') as mock_db:
+            mock_send.return_value = AsyncMock()
+            mock_db.return_value.__enter__.return_value = Mock()
+            yield mock_send, mock_db
+
     def test_health_endpoint(self, client):
         """Test the health check endpoint."""
         response = client.get("/health")
@@ -54,30 +72,19 @@ class TestTelegramIntegration:
         assert response.status_code == 200
         assert response.json() == {"status": "ok"}
 
-    @patch('src.bot.send_telegram_message')
-    @patch('src.bot.SessionLocal')
-    def test_webhook_endpoint_receives_message(self, mock_db, mock_send, client, mock_telegram_update):
+    def test_webhook_endpoint_receives_message(self, telegram_mocks, client, mock_telegram_update):
         """Test that webhook endpoint receives and processes messages."""
-        # Setup mocks
-        mock_send.return_value = AsyncMock()
-        mock_db.return_value.__enter__.return_value = Mock()
-        
         # Send webhook request
         response = client.post("/webhook", json=mock_telegram_update)
         
         # Verify response
         assert response.status_code == 200
 
-    @patch('src.bot.send_telegram_message')
-    @patch('src.bot.SessionLocal')
-    def test_webhook_handles_text_message(self, mock_db, mock_send, client, mock_telegram_update):
+    def test_webhook_handles_text_message(self, telegram_mocks, client, mock_telegram_update):
         """Test webhook handling of text messages."""
         # Modify message to include birth data
         mock_telegram_update["message"]["text"] = "DOB: 1990-01-15\nTime: 14:30\nLat: 40.7128\nLng: -74.0060"
         
-        mock_send.return_value = AsyncMock()
-        mock_db.return_value.__enter__.return_value = Mock()
-        
         response = client.post("/webhook", json=mock_telegram_update)
         assert response.status_code == 200
 
@@ -103,44 +110,58 @@ class TestTelegramIntegration:
         assert response.status_code in [200, 400, 500]
 
 
+class FakeTelegramAPI:
+    """In-memory Telegram Bot API that records requests and replies with a fixed response."""
+
+    def __init__(self):
+        self.requests = []
+        self.status_code = 200
+        self.payload = {"ok": True, "result": {"message_id": 1}}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(self.status_code, json=self.payload)
+
+
+@pytest.fixture
+async def telegram_api(monkeypatch):
+    """Route the bot's shared Telegram client through a FakeTelegramAPI."""
+    import src.bot
+    
+    api = FakeTelegramAPI()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(api.handle))
+    monkeypatch.setattr(src.bot, "_telegram_client", client)
+    yield api
+    await client.aclose()
+
+
 @pytest.mark.integration
 class TestMessageSending:
     """Tests for message sending to Telegram API."""
 
-    @pytest.mark.asyncio
-    @patch('httpx.AsyncClient.post')
-    async def test_send_telegram_message_success(self, mock_post):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_send_telegram_message_success(self, telegram_api):
         """Test successful message sending."""
-        from src.bot import send_telegram_message
-        
-        # Mock successful API response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True, "result": {"message_id": 1}}
-        mock_post.return_value = mock_response
-        
         # Send message
         result = await send_telegram_message(
             chat_id=123456,
             text="Test message"
         )
         
-        # Verify API was called
-        mock_post.assert_called_once()
+        # Verify API was called once with the message
+        assert len(telegram_api.requests) == 1
+        request = telegram_api.requests[0]
+        assert request.url.path.endswith("/sendMessage")
+        assert json.loads(request.content)["text"] == "Test message"
         
-        # Verify success - result should be the API response or similar
+        # Verify success - result is the API response
         assert result is not None
+        assert result.json()["result"]["message_id"] == 1
 
-    @pytest.mark.asyncio
-    @patch('httpx.AsyncClient.post')
-    async def test_send_telegram_message_with_html(self, mock_post):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_send_telegram_message_with_html(self, telegram_api):
         """Test sending message with HTML formatting."""
-        from src.bot import send_telegram_message
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True}
-        mock_post.return_value = mock_response
+        telegram_api.payload = {"ok": True}
         
         # Send message with HTML
         await send_telegram_message(
@@ -150,61 +171,57 @@ class TestMessageSending:
         )
         
         # Verify parse_mode was passed
-        call_args = mock_post.call_args
-        assert call_args is not None
+        assert len(telegram_api.requests) == 1
+        assert json.loads(telegram_api.requests[0].content)["parse_mode"] == "HTML"
 
-    @pytest.mark.asyncio
-    @patch('httpx.AsyncClient.post')
-    async def test_send_telegram_message_handles_api_error(self, mock_post):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_send_telegram_message_handles_api_error(self, telegram_api):
         """Test handling of Telegram API errors."""
-        from src.bot import send_telegram_message
-        
         # Mock error response
-        mock_response = Mock()
-        mock_response.status_code = 400
-        mock_response.json.return_value = {
+        telegram_api.status_code = 400
+        telegram_api.payload = {
             "ok": False,
             "error_code": 400,
             "description": "Bad Request"
         }
-        mock_post.return_value = mock_response
         
-        # Should handle error gracefully - either returns error result or raises exception
-        result = None
-        error_raised = False
-        try:
-            result = await send_telegram_message(
-                chat_id=123456,
-                text="Test message"
-            )
-        except Exception:
-            error_raised = True
+        # A 400 (chat not found / bot blocked) is logged and reported as None, not raised
+        result = await send_telegram_message(
+            chat_id=123456,
+            text="Test message"
+        )
         
-        # Either result is returned (even if error) or exception was raised
-        assert result is not None or error_raised
+        assert result is None
+        assert len(telegram_api.requests) == 1
 
-    @pytest.mark.asyncio
-    @patch('httpx.AsyncClient.post')
-    async def test_send_telegram_message_with_long_text(self, mock_post):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_send_telegram_message_with_long_text(self, telegram_api):
         """Test sending long messages that need splitting."""
-        from src.bot import send_telegram_message
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True}
-        mock_post.return_value = mock_response
-        
-        # Create long text
-        long_text = "a" * 5000
+        telegram_api.payload = {"ok": True}
         
         # Should handle long text
         await send_telegram_message(
             chat_id=123456,
-            text=long_text
+            text=LONG_TEXT
         )
         
-        # May be called multiple times for split messages
-        assert mock_post.call_count >= 1
+        # Split into one request per chunk
+        assert len(telegram_api.requests) == 2
+        sent = "".join(json.loads(r.content)["text"] for r in telegram_api.requests)
+        assert sent == LONG_TEXT
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_send_telegram_message_concurrent_sends(self, telegram_api):
+        """Test that concurrent sends share the client and each reach the API."""
+        chat_ids = [111, 222, 333, 444]
+        results = await asyncio.gather(*(
+            send_telegram_message(chat_id=chat_id, text=f"Hello {chat_id}")
+            for chat_id in chat_ids
+        ))
+        
+        assert all(result is not None for result in results)
+        sent = {json.loads(r.content)["chat_id"]: json.loads(r.content)["text"] for r in telegram_api.requests}
+        assert sent == {chat_id: f"Hello {chat_id}" for chat_id in chat_ids}
 
 
 @pytest.mark.integration
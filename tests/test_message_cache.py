@@ -4,18 +4,36 @@ Unit tests for message_cache.py
 Tests the runtime cache for deduplicating Telegram webhook messages.
 """
 
+import time
 import pytest
-from datetime import datetime, timezone, timedelta
+from collections import OrderedDict
 from src.db import init_db
 from src.message_cache import (
     mark_if_new,
     get_cache_stats,
     clear_cache,
     get_pending_messages,
-    CACHE_EXPIRY_HOURS
+    count_pending_other_than,
+    fetch_pending_texts,
+    CACHE_EXPIRY_HOURS,
+    CACHE_SHARDS
 )
-# Import _processed_messages only for testing expiry behavior
-from src.message_cache import _processed_messages, _cache_lock
+# Import cache internals only for testing expiry behavior
+from src.message_cache import _processed_messages, _cache_locks, _shard
+
+# Two users whose entries land in the same cache shard
+USER_A = 123456
+USER_B = USER_A + CACHE_SHARDS
+
+
+def _cached_users(telegram_id):
+    """Return the cache shard dict holding a user's entries."""
+    return _processed_messages[_shard(telegram_id)]
+
+
+def _lock_for(telegram_id):
+    """Return the lock guarding a user's cache shard."""
+    return _cache_locks[_shard(telegram_id)]
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -33,18 +51,24 @@ def clean_cache():
     clear_cache()
 
 
+@pytest.fixture
+def cleanup_every_insert(monkeypatch):
+    """Fixture to run cache cleanup on every insert instead of every CACHE_CLEANUP_INTERVAL."""
+    monkeypatch.setattr("src.message_cache.CACHE_CLEANUP_INTERVAL", 1)
+
+
 @pytest.mark.unit
 class TestMessageCache:
     """Tests for message deduplication cache."""
     
     def test_message_not_processed_initially(self, clean_cache):
         """Test that a new message is not marked as processed."""
-        result = mark_if_new("123456", 1)
+        result = mark_if_new(123456, 1)
         assert result is True  # Message was new
     
     def test_mark_and_check_message_processed(self, clean_cache):
         """Test marking a message as processed and checking it."""
-        telegram_id = "123456"
+        telegram_id = 123456
         message_id = 1
         
         # First call - message is new
@@ -56,20 +80,20 @@ class TestMessageCache:
     def test_different_messages_independent(self, clean_cache):
         """Test that different messages are tracked independently."""
         # Mark first message as processed
-        mark_if_new("123456", 1)
+        mark_if_new(123456, 1)
         
         # Different message ID should not be processed
-        assert mark_if_new("123456", 2) is True
+        assert mark_if_new(123456, 2) is True
         
         # Different user ID should not be processed
-        assert mark_if_new("789012", 1) is True
+        assert mark_if_new(789012, 1) is True
         
         # Original message should be duplicate
-        assert mark_if_new("123456", 1) is False
+        assert mark_if_new(123456, 1) is False
     
     def test_multiple_messages_from_same_user(self, clean_cache):
         """Test tracking multiple messages from the same user."""
-        telegram_id = "123456"
+        telegram_id = 123456
         
         assert mark_if_new(telegram_id, 1) is True
         assert mark_if_new(telegram_id, 2) is True
@@ -92,9 +116,9 @@ class TestMessageCache:
         assert "db_entries" in stats
         
         # Add some entries
-        mark_if_new("user1", 1)
-        mark_if_new("user2", 2)
-        mark_if_new("user3", 3)
+        mark_if_new(1001, 1)
+        mark_if_new(1002, 2)
+        mark_if_new(1003, 3)
         
         stats = get_cache_stats()
         assert stats["memory_entries"] == 3
@@ -103,8 +127,8 @@ class TestMessageCache:
     def test_clear_cache(self, clean_cache):
         """Test clearing the cache."""
         # Add entries
-        mark_if_new("user1", 1)
-        mark_if_new("user2", 2)
+        mark_if_new(1001, 1)
+        mark_if_new(1002, 2)
         
         assert get_cache_stats()["memory_entries"] >= 2
         
@@ -113,75 +137,127 @@ class TestMessageCache:
         
         assert get_cache_stats()["memory_entries"] == 0
         assert get_cache_stats()["db_entries"] == 0
-        assert mark_if_new("user1", 1) is True  # Should be new again
+        assert mark_if_new(1001, 1) is True  # Should be new again
     
-    def test_cache_cleanup_removes_old_entries(self, clean_cache):
+    def test_cache_cleanup_removes_old_entries(self, clean_cache, cleanup_every_insert):
         """Test that old entries are cleaned up automatically."""
         # Add an entry with timestamp in the past
-        telegram_id = "123456"
+        telegram_id = USER_A
         message_id = 1
-        old_timestamp = datetime.now(timezone.utc) - timedelta(hours=CACHE_EXPIRY_HOURS + 1)
+        old_timestamp = time.monotonic() - (CACHE_EXPIRY_HOURS + 1) * 3600
         
         # Directly manipulate cache to add old entry (use lock for thread safety)
-        with _cache_lock:
-            _processed_messages[(telegram_id, message_id)] = old_timestamp
+        with _lock_for(telegram_id):
+            _cached_users(telegram_id)[telegram_id] = OrderedDict({message_id: old_timestamp})
         
-        # Add a new entry (this triggers cleanup)
-        mark_if_new("789012", 2)
+        # Add a new entry in the same shard (this triggers cleanup)
+        mark_if_new(USER_B, 2)
         
         # Old entry should be cleaned up
-        with _cache_lock:
-            assert (telegram_id, message_id) not in _processed_messages
+        with _lock_for(telegram_id):
+            assert telegram_id not in _cached_users(telegram_id)
             # New entry should still be there
-            assert ("789012", 2) in _processed_messages
+            assert 2 in _cached_users(USER_B)[USER_B]
     
+    def test_cache_cleanup_removes_all_expired_entries_at_front(self, clean_cache, cleanup_every_insert):
+        """Test that cleanup drains every expired entry from the front of the cache."""
+        old_timestamp = time.monotonic() - (CACHE_EXPIRY_HOURS + 1) * 3600
+
+        with _lock_for(USER_A):
+            _cached_users(USER_A)[USER_A] = OrderedDict(
+                (message_id, old_timestamp) for message_id in range(1, 4)
+            )
+
+        # Add new entries in the same shard (each triggers cleanup)
+        mark_if_new(USER_B, 1)
+        mark_if_new(USER_B, 2)
+
+        with _lock_for(USER_B):
+            # Fully expired buckets are dropped
+            assert list(_cached_users(USER_B)) == [USER_B]
+            assert list(_cached_users(USER_B)[USER_B]) == [1, 2]
+
+    def test_cache_cleanup_is_amortized(self, clean_cache, monkeypatch):
+        """Test that cleanup only runs once every CACHE_CLEANUP_INTERVAL inserts."""
+        monkeypatch.setattr("src.message_cache.CACHE_CLEANUP_INTERVAL", 4)
+        monkeypatch.setattr("src.message_cache._insert_counters", [0] * CACHE_SHARDS)
+        old_timestamp = time.monotonic() - (CACHE_EXPIRY_HOURS + 1) * 3600
+
+        with _lock_for(USER_A):
+            _cached_users(USER_A)[USER_A] = OrderedDict({1: old_timestamp})
+
+        # First three inserts into the shard do not trigger cleanup
+        for message_id in range(1, 4):
+            mark_if_new(USER_B, message_id)
+        with _lock_for(USER_A):
+            assert 1 in _cached_users(USER_A)[USER_A]
+
+        # Fourth insert does
+        mark_if_new(USER_B, 4)
+        with _lock_for(USER_A):
+            assert USER_A not in _cached_users(USER_A)
+
+    def test_cleanup_only_touches_its_own_shard(self, clean_cache, cleanup_every_insert):
+        """Test that an insert only cleans up the shard it landed in."""
+        other_user = USER_A + 1
+        assert _shard(other_user) != _shard(USER_A)
+        old_timestamp = time.monotonic() - (CACHE_EXPIRY_HOURS + 1) * 3600
+
+        with _lock_for(other_user):
+            _cached_users(other_user)[other_user] = OrderedDict({1: old_timestamp})
+
+        mark_if_new(USER_A, 1)
+
+        with _lock_for(other_user):
+            assert other_user in _cached_users(other_user)
+
     def test_expired_entry_treated_as_new(self, clean_cache):
         """Test that expired entries are treated as new messages."""
-        telegram_id = "123456"
+        telegram_id = 123456
         message_id = 1
-        old_timestamp = datetime.now(timezone.utc) - timedelta(hours=CACHE_EXPIRY_HOURS + 1)
+        old_timestamp = time.monotonic() - (CACHE_EXPIRY_HOURS + 1) * 3600
         
         # Directly add an expired entry
-        with _cache_lock:
-            _processed_messages[(telegram_id, message_id)] = old_timestamp
+        with _lock_for(telegram_id):
+            _cached_users(telegram_id)[telegram_id] = OrderedDict({message_id: old_timestamp})
         
         # Should be treated as new (expired)
         assert mark_if_new(telegram_id, message_id) is True
     
-    def test_cache_cleanup_keeps_recent_entries(self, clean_cache):
+    def test_cache_cleanup_keeps_recent_entries(self, clean_cache, cleanup_every_insert):
         """Test that recent entries are not cleaned up."""
         # Add recent entries
-        mark_if_new("user1", 1)
-        mark_if_new("user2", 2)
+        mark_if_new(1001, 1)
+        mark_if_new(1002, 2)
         
         # Add another entry (triggers cleanup)
-        mark_if_new("user3", 3)
+        mark_if_new(1003, 3)
         
         # All recent entries should still be there (duplicates)
-        assert mark_if_new("user1", 1) is False
-        assert mark_if_new("user2", 2) is False
-        assert mark_if_new("user3", 3) is False
+        assert mark_if_new(1001, 1) is False
+        assert mark_if_new(1002, 2) is False
+        assert mark_if_new(1003, 3) is False
     
     def test_duplicate_message_ids_different_users(self, clean_cache):
         """Test that same message ID from different users are tracked separately."""
         # Same message ID from different users
-        mark_if_new("user1", 100)
-        mark_if_new("user2", 100)
+        mark_if_new(1001, 100)
+        mark_if_new(1002, 100)
         
         # Both should be marked as processed (duplicates now)
-        assert mark_if_new("user1", 100) is False
-        assert mark_if_new("user2", 100) is False
+        assert mark_if_new(1001, 100) is False
+        assert mark_if_new(1002, 100) is False
         
         # Different user with same message ID should be new
-        assert mark_if_new("user3", 100) is True
+        assert mark_if_new(1003, 100) is True
     
-    def test_string_telegram_id_handling(self, clean_cache):
-        """Test that string telegram IDs are handled correctly."""
-        # Test with string IDs (as they come from Telegram API)
-        assert mark_if_new("123456789", 1) is True
+    def test_large_telegram_id_handling(self, clean_cache):
+        """Test that telegram IDs beyond 32 bits are handled correctly."""
+        # Telegram user IDs are 64-bit integers (as they come from Telegram API)
+        assert mark_if_new(5123456789, 1) is True
         
-        assert mark_if_new("123456789", 1) is False  # Duplicate
-        assert mark_if_new("987654321", 1) is True  # Different user
+        assert mark_if_new(5123456789, 1) is False  # Duplicate
+        assert mark_if_new(5987654321, 1) is True  # Different user
     
     def test_concurrent_access_safety(self, clean_cache):
         """Test that cache operations are thread-safe."""
@@ -190,7 +266,7 @@ class TestMessageCache:
         results = []
         
         def mark_message():
-            result = mark_if_new("user1", 1)
+            result = mark_if_new(1001, 1)
             results.append(result)
         
         # Create multiple threads trying to mark the same message
@@ -204,10 +280,26 @@ class TestMessageCache:
         # Exactly one thread should have successfully marked it as new
         assert sum(results) == 1
     
+    def test_cached_duplicate_does_not_wait_for_shard_lock(self, clean_cache):
+        """Test that a cached duplicate is rejected while the shard lock is held elsewhere."""
+        import threading
+        
+        assert mark_if_new(USER_A, 1) is True
+        
+        results = []
+        with _lock_for(USER_A):
+            # Another user in the same shard is mid-insert; the duplicate must not block
+            thread = threading.Thread(target=lambda: results.append(mark_if_new(USER_A, 1)))
+            thread.start()
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        
+        assert results == [False]
+    
     def test_persistence_across_restart_simulation(self, clean_cache):
         """Test that messages persist across simulated restart (in-memory cache cleared)."""
         # Mark a message as processed
-        telegram_id = "test_user"
+        telegram_id = 4242
         message_id = 999
         
         # First time should be new
@@ -217,19 +309,19 @@ class TestMessageCache:
         assert mark_if_new(telegram_id, message_id) is False
         
         # Simulate restart by clearing in-memory cache only
-        with _cache_lock:
-            _processed_messages.clear()
+        with _lock_for(telegram_id):
+            _cached_users(telegram_id).clear()
         
         # After "restart", message should still be detected as duplicate (database hit)
         assert mark_if_new(telegram_id, message_id) is False
         
         # Verify message is back in memory cache after database hit
-        with _cache_lock:
-            assert (telegram_id, message_id) in _processed_messages
+        with _lock_for(telegram_id):
+            assert message_id in _cached_users(telegram_id)[telegram_id]
     
     def test_mark_if_new_stores_message_text(self, clean_cache):
         """Test that message text is stored when marking a message as new."""
-        telegram_id = "user123"
+        telegram_id = 123
         message_id = 1
         message_text = "Hello, this is a test message"
         
@@ -245,7 +337,7 @@ class TestMessageCache:
     
     def test_mark_if_new_without_message_text(self, clean_cache):
         """Test that marking a message without text works (backward compatibility)."""
-        telegram_id = "user456"
+        telegram_id = 456
         message_id = 2
         
         # Mark message without text (None)
@@ -260,7 +352,7 @@ class TestMessageCache:
     
     def test_get_pending_messages_returns_all_text(self, clean_cache):
         """Test that get_pending_messages returns all message texts in order."""
-        telegram_id = "user789"
+        telegram_id = 789
         
         # Add multiple messages with text
         messages = [
@@ -283,7 +375,7 @@ class TestMessageCache:
     
     def test_message_text_with_special_characters(self, clean_cache):
         """Test that message text with special characters is stored correctly."""
-        telegram_id = "user_special"
+        telegram_id = 3002
         message_id = 1
         message_text = "Hello! 👋\nThis is a test\nWith special chars: @#$%^&*()"
         
@@ -297,7 +389,7 @@ class TestMessageCache:
     
     def test_empty_message_text(self, clean_cache):
         """Test that empty string message text is handled correctly."""
-        telegram_id = "user_empty"
+        telegram_id = 3001
         message_id = 1
         message_text = ""
         
@@ -308,3 +400,36 @@ class TestMessageCache:
         pending = get_pending_messages(telegram_id)
         assert len(pending) == 1
         assert pending[0].message_text == ""
+    
+    def test_count_pending_other_than_excludes_current_message(self, clean_cache):
+        """Test that the pending count excludes the given message ID."""
+        telegram_id = 2001
+        
+        mark_if_new(telegram_id, 1, "First")
+        assert count_pending_other_than(telegram_id, 1) == 0
+        
+        mark_if_new(telegram_id, 2, "Second")
+        mark_if_new(telegram_id, 3, "Third")
+        assert count_pending_other_than(telegram_id, 3) == 2
+        
+        # Other users are not counted
+        assert count_pending_other_than(2002, 1) == 0
+    
+    def test_fetch_pending_texts_returns_texts_in_order(self, clean_cache):
+        """Test that fetch_pending_texts returns only texts, oldest first."""
+        telegram_id = 2003
+        
+        mark_if_new(telegram_id, 1, "First message")
+        mark_if_new(telegram_id, 2)
+        mark_if_new(telegram_id, 3, "Third message")
+        
+        assert fetch_pending_texts(telegram_id) == ["First message", None, "Third message"]
+    
+    def test_fetch_pending_texts_keeps_most_recent(self, clean_cache):
+        """Test that fetch_pending_texts drops the oldest texts beyond the limit."""
+        telegram_id = 2004
+        
+        for message_id in range(1, 5):
+            mark_if_new(telegram_id, message_id, f"Message {message_id}")
+        
+        assert fetch_pending_texts(telegram_id, limit=2) == ["Message 3", "Message 4"]
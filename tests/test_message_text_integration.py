@@ -8,14 +8,14 @@ across the entire message throttling and combining pipeline.
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
-from src.main import app
 from src.message_cache import clear_cache, get_pending_messages, mark_all_pending_as_replied
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+@pytest.fixture(scope="module")
+def client(app):
+    """FastAPI test client shared by the module; startup/shutdown run once."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(autouse=True)
@@ -99,7 +99,7 @@ class TestMessageTextIntegration:
         assert response3.json().get("throttled") is True
         
         # Mark all as replied to simulate successful processing
-        mark_all_pending_as_replied(str(user_id))
+        mark_all_pending_as_replied(user_id)
         
         # Send fourth message (should combine pending messages 2 and 3 if any remain)
         # But since we marked them as replied, this should be a new message
@@ -141,7 +141,7 @@ class TestMessageTextIntegration:
         client.post("/webhook", json=payload3)
         
         # Retrieve pending messages to check they're stored
-        pending = get_pending_messages(str(user_id))
+        pending = get_pending_messages(user_id)
         assert len(pending) == 3
         
         # Verify texts are stored correctly
@@ -165,7 +165,7 @@ class TestMessageTextIntegration:
         assert call_args["message"]["text"] == message_text
         
         # Also verify it's stored in database
-        pending = get_pending_messages(str(user_id))
+        pending = get_pending_messages(user_id)
         assert len(pending) == 1
         assert pending[0].message_text == message_text
     
@@ -181,7 +181,7 @@ class TestMessageTextIntegration:
         assert mock_bot_handler.call_count == 1
         
         # Verify empty text is stored
-        pending = get_pending_messages(str(user_id))
+        pending = get_pending_messages(user_id)
         assert len(pending) == 1
         assert pending[0].message_text == ""
     
@@ -208,7 +208,7 @@ class TestMessageTextIntegration:
         assert mock_bot_handler.call_count == 1
         
         # Verify None/empty text is stored
-        pending = get_pending_messages(str(user_id))
+        pending = get_pending_messages(user_id)
         assert len(pending) == 1
         # message_text could be None or empty string
         assert pending[0].message_text in [None, ""]
@@ -80,7 +80,7 @@ class TestNullMessageTextHandling:
         with NULL text are marked as replied.
         """
         user_id = 55555
-        telegram_id = str(user_id)
+        telegram_id = user_id
         
         # Track what text is sent to the bot
         captured_texts = []
@@ -117,7 +117,7 @@ class TestNullMessageTextHandling:
         text is not overridden with empty string.
         """
         user_id = 66666
-        telegram_id = str(user_id)
+        telegram_id = user_id
         
         # Manually create pending messages with NULL text
         session = SessionLocal()
@@ -178,7 +178,7 @@ class TestNullMessageTextHandling:
         specifically checking for the message about old messages from migration.
         """
         user_id = 77777
-        telegram_id = str(user_id)
+        telegram_id = user_id
         
         # Create pending messages with NULL text
         session = SessionLocal()
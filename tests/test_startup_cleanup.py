@@ -42,7 +42,7 @@ class TestStartupCleanup:
             old_time = datetime.now(timezone.utc) - timedelta(minutes=30)
             stale_messages = [
                 ProcessedMessage(
-                    telegram_id="140230022",
+                    telegram_id=140230022,
                     message_id=1900 + i,
                     processed_at=old_time,
                     reply_sent=False,
@@ -56,7 +56,7 @@ class TestStartupCleanup:
             
             # Verify they're pending
             pending_count = session.query(ProcessedMessage).filter_by(
-                telegram_id="140230022",
+                telegram_id=140230022,
                 reply_sent=False
             ).count()
             assert pending_count == 6
@@ -70,7 +70,7 @@ class TestStartupCleanup:
             session = SessionLocal()
             try:
                 pending_count = session.query(ProcessedMessage).filter_by(
-                    telegram_id="140230022",
+                    telegram_id=140230022,
                     reply_sent=False
                 ).count()
                 
@@ -79,7 +79,7 @@ class TestStartupCleanup:
                 
                 # Verify they were marked, not deleted
                 total_count = session.query(ProcessedMessage).filter_by(
-                    telegram_id="140230022"
+                    telegram_id=140230022
                 ).count()
                 assert total_count == 6, "Messages should be marked, not deleted"
             finally:
@@ -92,7 +92,7 @@ class TestStartupCleanup:
         try:
             old_time = datetime.now(timezone.utc) - timedelta(minutes=30)
             stale_message = ProcessedMessage(
-                telegram_id="999999",
+                telegram_id=999999,
                 message_id=1,
                 processed_at=old_time,
                 reply_sent=False,
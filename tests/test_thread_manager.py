@@ -5,13 +5,17 @@ Tests the FIFO logic, thread trimming, and reset functionality.
 """
 
 import pytest
+from datetime import datetime, timedelta, timezone
 
 from src.db import SessionLocal, init_db
+from src.models import ConversationMessage
 from src.thread_manager import (
     add_message_to_thread,
+    fetch_recent_messages,
     get_conversation_thread,
     reset_thread,
     get_thread_summary,
+    trim_thread_if_needed,
     MAX_THREAD_LENGTH,
 )
 
@@ -28,7 +32,7 @@ def db_session():
 @pytest.fixture(autouse=True)
 def cleanup_test_users(db_session):
     """Clean up test users before each test"""
-    test_users = ["test_user_basic", "test_user_fifo", "test_user_reset", "test_user_format"]
+    test_users = [900001, 900002, 900003, 900004, 900005, 900009, 900010]
     for user_id in test_users:
         reset_thread(db_session, user_id)
     yield
@@ -37,19 +41,18 @@ def cleanup_test_users(db_session):
 @pytest.mark.unit
 def test_basic_thread_operations(db_session):
     """Test basic thread operations"""
-    test_user_id = "test_user_basic"
+    test_user_id = 900001
     
     # Add first user message
-    msg1 = add_message_to_thread(db_session, test_user_id, "user", "What is my sun sign?")
-    assert msg1.is_first_pair is True, "First user message should be marked as first_pair"
+    add_message_to_thread(db_session, test_user_id, "user", "What is my sun sign?")
+    assert get_thread_summary(db_session, test_user_id)['fixed_messages'] == 1
     
     # Add first assistant message
-    msg2 = add_message_to_thread(db_session, test_user_id, "assistant", "Your sun sign is Taurus.")
-    assert msg2.is_first_pair is True, "First assistant message should be marked as first_pair"
+    add_message_to_thread(db_session, test_user_id, "assistant", "Your sun sign is Taurus.")
+    assert get_thread_summary(db_session, test_user_id)['fixed_messages'] == 2
     
     # Add third message (should not be part of first pair)
-    msg3 = add_message_to_thread(db_session, test_user_id, "user", "Tell me more about it")
-    assert msg3.is_first_pair is False, "Third message should not be marked as first_pair"
+    add_message_to_thread(db_session, test_user_id, "user", "Tell me more about it")
     
     # Check thread
     thread = get_conversation_thread(db_session, test_user_id)
@@ -66,7 +69,7 @@ def test_basic_thread_operations(db_session):
 @pytest.mark.unit
 def test_fifo_trimming(db_session):
     """Test FIFO trimming when thread exceeds max length"""
-    test_user_id = "test_user_fifo"
+    test_user_id = 900002
     
     # Add 12 messages (exceeding MAX_THREAD_LENGTH of 10)
     for i in range(12):
@@ -99,7 +102,7 @@ def test_fifo_trimming(db_session):
 @pytest.mark.unit
 def test_reset_thread(db_session):
     """Test thread reset functionality"""
-    test_user_id = "test_user_reset"
+    test_user_id = 900003
     
     # Add some messages
     for i in range(5):
@@ -121,7 +124,7 @@ def test_reset_thread(db_session):
 @pytest.mark.unit
 def test_conversation_history_format(db_session):
     """Test that conversation history is in correct format for LLM"""
-    test_user_id = "test_user_format"
+    test_user_id = 900004
     
     # Add some messages
     add_message_to_thread(db_session, test_user_id, "user", "Hello!")
@@ -142,7 +145,7 @@ def test_conversation_history_format(db_session):
 @pytest.mark.unit
 def test_thread_summary_with_empty_thread(db_session):
     """Test thread summary with no messages"""
-    test_user_id = "test_user_empty"
+    test_user_id = 900006
     reset_thread(db_session, test_user_id)
     
     summary = get_thread_summary(db_session, test_user_id)
@@ -157,8 +160,8 @@ def test_thread_summary_with_empty_thread(db_session):
 @pytest.mark.unit
 def test_multiple_users_isolation(db_session):
     """Test that threads are isolated per user"""
-    user1 = "test_user_isolation_1"
-    user2 = "test_user_isolation_2"
+    user1 = 900007
+    user2 = 900008
     
     reset_thread(db_session, user1)
     reset_thread(db_session, user2)
@@ -178,3 +181,69 @@ def test_multiple_users_isolation(db_session):
     assert len(thread2) == 1, "User 2 should have 1 message"
     assert thread1[0]['content'] == "User 1 message"
     assert thread2[0]['content'] == "User 2 message"
+
+
+@pytest.mark.unit
+def test_fetch_recent_messages_returns_parallel_lists(db_session):
+    """Test that recent messages come back as chronological role/content lists"""
+    test_user_id = 900005
+    
+    for i in range(4):
+        role = "user" if i % 2 == 0 else "assistant"
+        add_message_to_thread(db_session, test_user_id, role, f"Message {i + 1}")
+    
+    roles, contents = fetch_recent_messages(db_session, test_user_id, limit=3)
+    assert roles == ["assistant", "user", "assistant"]
+    assert contents == ["Message 2", "Message 3", "Message 4"]
+    
+    roles, contents = fetch_recent_messages(db_session, test_user_id, limit=None)
+    assert len(roles) == len(contents) == 4
+    assert contents[0] == "Message 1"
+
+
+@pytest.mark.unit
+def test_trim_thread_in_isolation(db_session):
+    """Test trimming without pre-fetched rows, below and above the limit"""
+    test_user_id = 900009
+    
+    # Insert directly so add_message_to_thread doesn't trim along the way
+    for i in range(MAX_THREAD_LENGTH):
+        role = "user" if i % 2 == 0 else "assistant"
+        db_session.add(ConversationMessage(telegram_id=test_user_id, role=role, content=f"Message {i + 1}"))
+    db_session.commit()
+    
+    trim_thread_if_needed(db_session, test_user_id)
+    assert get_thread_summary(db_session, test_user_id)['total_messages'] == MAX_THREAD_LENGTH
+    
+    for i in range(MAX_THREAD_LENGTH, MAX_THREAD_LENGTH + 2):
+        role = "user" if i % 2 == 0 else "assistant"
+        db_session.add(ConversationMessage(telegram_id=test_user_id, role=role, content=f"Message {i + 1}"))
+    db_session.commit()
+    
+    trim_thread_if_needed(db_session, test_user_id)
+    db_session.commit()
+    
+    thread = get_conversation_thread(db_session, test_user_id)
+    contents = [msg['content'] for msg in thread]
+    assert len(thread) == MAX_THREAD_LENGTH
+    assert contents[:2] == ["Message 1", "Message 2"]
+    assert "Message 3" not in contents
+    assert "Message 4" not in contents
+
+
+@pytest.mark.unit
+def test_messages_are_stamped_in_utc_by_the_application(db_session):
+    """Test that created_at is set on insert without relying on a server default"""
+    test_user_id = 900010
+    
+    # Tables created before the server default existed (e.g. SQLite without
+    # Alembic) still get a timestamp from the column's Python-side default
+    assert ConversationMessage.__table__.c.created_at.default is not None
+    
+    add_message_to_thread(db_session, test_user_id, "user", "Hello")
+    
+    created_at = db_session.query(ConversationMessage.created_at)\
+        .filter(ConversationMessage.telegram_id == test_user_id).scalar()
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert created_at is not None
+    assert abs(utc_now - created_at) < timedelta(minutes=1)
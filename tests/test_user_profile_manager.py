@@ -10,12 +10,15 @@ Tests the LLM-maintained user profile functionality:
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from src.db import SessionLocal, init_db
 from src.models import User
 from src.user_profile_manager import (
     UserProfileManager,
     update_profile_after_interaction,
+    update_profile_after_interaction_async,
+    schedule_profile_update,
+    clear_profile_cache,
     MAX_PROFILE_LENGTH
 )
 
@@ -33,17 +36,18 @@ def db_session():
 def cleanup_test_users(db_session):
     """Clean up test users before and after each test"""
     test_users = [
-        "test_profile_user",
-        "test_profile_update",
-        "test_profile_length",
-        "test_profile_preserve",
-        "test_profile_none"
+        910010,
+        910009,
+        910006,
+        910008,
+        910007
     ]
     for user_id in test_users:
         user = db_session.query(User).filter_by(telegram_id=user_id).first()
         if user:
             db_session.delete(user)
     db_session.commit()
+    clear_profile_cache()
     yield
     # Cleanup after test
     for user_id in test_users:
@@ -65,48 +69,48 @@ class TestUserProfileManager:
     def test_get_user_profile_none_when_no_profile(self, db_session):
         """Test getting profile when user exists but has no profile."""
         # Create user without profile
-        user = User(telegram_id="test_profile_none")
+        user = User(telegram_id=910007)
         db_session.add(user)
         db_session.commit()
         
-        profile = UserProfileManager.get_user_profile(db_session, "test_profile_none")
+        profile = UserProfileManager.get_user_profile(db_session, 910007)
         assert profile is None, "Should return None when user has no profile"
 
     def test_update_and_get_user_profile(self, db_session):
         """Test updating and retrieving user profile."""
         # Create user
-        user = User(telegram_id="test_profile_user")
+        user = User(telegram_id=910010)
         db_session.add(user)
         db_session.commit()
         
         # Update profile
         test_profile = "Пользователь предпочитает краткие ответы."
-        UserProfileManager.update_user_profile(db_session, "test_profile_user", test_profile)
+        UserProfileManager.update_user_profile(db_session, 910010, test_profile)
         
         # Retrieve profile
-        retrieved = UserProfileManager.get_user_profile(db_session, "test_profile_user")
+        retrieved = UserProfileManager.get_user_profile(db_session, 910010)
         assert retrieved == test_profile, "Retrieved profile should match saved profile"
 
     def test_update_profile_truncates_if_too_long(self, db_session):
         """Test that profile is truncated if exceeds MAX_PROFILE_LENGTH."""
         # Create user
-        user = User(telegram_id="test_profile_length")
+        user = User(telegram_id=910006)
         db_session.add(user)
         db_session.commit()
         
         # Create profile that exceeds limit
         long_profile = "А" * (MAX_PROFILE_LENGTH + 1000)
-        UserProfileManager.update_user_profile(db_session, "test_profile_length", long_profile)
+        UserProfileManager.update_user_profile(db_session, 910006, long_profile)
         
         # Retrieve and verify truncation
-        retrieved = UserProfileManager.get_user_profile(db_session, "test_profile_length")
+        retrieved = UserProfileManager.get_user_profile(db_session, 910006)
         assert len(retrieved) == MAX_PROFILE_LENGTH, f"Profile should be truncated to {MAX_PROFILE_LENGTH} chars"
 
     def test_update_profile_preserves_existing_user_data(self, db_session):
         """Test that updating profile doesn't affect other user data."""
         # Create user with existing data
         user = User(
-            telegram_id="test_profile_preserve",
+            telegram_id=910008,
             state="chatting_about_chart",
             missing_fields="dob,time",
             assistant_mode=True
@@ -116,10 +120,10 @@ class TestUserProfileManager:
         
         # Update profile
         test_profile = "Новый профиль пользователя."
-        UserProfileManager.update_user_profile(db_session, "test_profile_preserve", test_profile)
+        UserProfileManager.update_user_profile(db_session, 910008, test_profile)
         
         # Verify other data is preserved
-        updated_user = db_session.query(User).filter_by(telegram_id="test_profile_preserve").first()
+        updated_user = db_session.query(User).filter_by(telegram_id=910008).first()
         assert updated_user.state == "chatting_about_chart", "User state should be preserved"
         assert updated_user.missing_fields == "dob,time", "Missing fields should be preserved"
         assert updated_user.assistant_mode is True, "Assistant mode should be preserved"
@@ -128,28 +132,59 @@ class TestUserProfileManager:
     def test_update_profile_multiple_times(self, db_session):
         """Test updating profile multiple times (profile evolution)."""
         # Create user
-        user = User(telegram_id="test_profile_update")
+        user = User(telegram_id=910009)
         db_session.add(user)
         db_session.commit()
         
         # First update
         profile1 = "Первое взаимодействие: пользователь задал вопрос о карьере."
-        UserProfileManager.update_user_profile(db_session, "test_profile_update", profile1)
-        retrieved1 = UserProfileManager.get_user_profile(db_session, "test_profile_update")
+        UserProfileManager.update_user_profile(db_session, 910009, profile1)
+        retrieved1 = UserProfileManager.get_user_profile(db_session, 910009)
         assert retrieved1 == profile1
         
         # Second update
         profile2 = "Второе взаимодействие: интересуется карьерой и отношениями."
-        UserProfileManager.update_user_profile(db_session, "test_profile_update", profile2)
-        retrieved2 = UserProfileManager.get_user_profile(db_session, "test_profile_update")
+        UserProfileManager.update_user_profile(db_session, 910009, profile2)
+        retrieved2 = UserProfileManager.get_user_profile(db_session, 910009)
         assert retrieved2 == profile2, "Profile should be updated to new value"
         
         # Third update
         profile3 = "Третье взаимодействие: предпочитает детальные ответы о карьере и финансах."
-        UserProfileManager.update_user_profile(db_session, "test_profile_update", profile3)
-        retrieved3 = UserProfileManager.get_user_profile(db_session, "test_profile_update")
+        UserProfileManager.update_user_profile(db_session, 910009, profile3)
+        retrieved3 = UserProfileManager.get_user_profile(db_session, 910009)
         assert retrieved3 == profile3, "Profile should be updated to latest value"
 
+    def test_get_user_profile_is_cached_until_update(self, db_session):
+        """Test that profile reads are served from cache and refreshed by updates."""
+        user = User(telegram_id=910007, user_profile="Старый профиль.")
+        db_session.add(user)
+        db_session.commit()
+        
+        assert UserProfileManager.get_user_profile(db_session, 910007) == "Старый профиль."
+        
+        # A write that bypasses UserProfileManager isn't seen until the entry expires
+        db_session.query(User).filter_by(telegram_id=910007).update({"user_profile": "Чужая запись."})
+        db_session.commit()
+        assert UserProfileManager.get_user_profile(db_session, 910007) == "Старый профиль."
+        
+        UserProfileManager.update_user_profile(db_session, 910007, "Новый профиль.")
+        assert UserProfileManager.get_user_profile(db_session, 910007) == "Новый профиль."
+
+    def test_update_profile_unchanged_skips_commit(self, db_session):
+        """Test that writing the same profile again doesn't commit."""
+        user = User(telegram_id=910009, user_profile="Тот же профиль.")
+        db_session.add(user)
+        db_session.commit()
+        
+        with patch.object(db_session, "commit", wraps=db_session.commit) as mock_commit:
+            UserProfileManager.update_user_profile(db_session, 910009, "Тот же профиль.")
+            mock_commit.assert_not_called()
+            
+            UserProfileManager.update_user_profile(db_session, 910009, "Другой профиль.")
+            mock_commit.assert_called_once()
+        
+        assert UserProfileManager.get_user_profile(db_session, 910009) == "Другой профиль."
+
     def test_build_profile_prompt_with_no_current_profile(self, db_session):
         """Test building prompt when user has no existing profile."""
         prompt = UserProfileManager.build_profile_prompt(
@@ -206,7 +241,7 @@ class TestProfileUpdateIntegration:
     def test_update_profile_after_interaction_success(self, db_session):
         """Test successful profile update after interaction."""
         # Setup
-        user = User(telegram_id="test_integration_user")
+        user = User(telegram_id=910002)
         db_session.add(user)
         db_session.commit()
         
@@ -216,7 +251,7 @@ class TestProfileUpdateIntegration:
         # Call update with mocked call_llm
         update_profile_after_interaction(
             session=db_session,
-            telegram_id="test_integration_user",
+            telegram_id=910002,
             conversation_history=[
                 {"role": "user", "content": "Привет"},
                 {"role": "assistant", "content": "Привет!"}
@@ -234,17 +269,107 @@ class TestProfileUpdateIntegration:
         assert call_args.kwargs['is_parser'] is True
         
         # Verify profile was saved
-        profile = UserProfileManager.get_user_profile(db_session, "test_integration_user")
+        profile = UserProfileManager.get_user_profile(db_session, 910002)
         assert profile == "Обновленный профиль пользователя."
         
         # Cleanup
-        db_session.query(User).filter_by(telegram_id="test_integration_user").delete()
+        db_session.query(User).filter_by(telegram_id=910002).delete()
+        db_session.commit()
+
+    async def test_update_profile_after_interaction_async_uses_own_session(self, db_session):
+        """Test that the background update saves the profile through its own session."""
+        user = User(telegram_id=910006)
+        db_session.add(user)
         db_session.commit()
+        
+        mock_call_llm = Mock(return_value="Фоновый профиль.")
+        
+        await update_profile_after_interaction_async(
+            telegram_id=910006,
+            latest_user_message="Как дела?",
+            latest_assistant_response="Хорошо!",
+            call_llm_func=mock_call_llm
+        )
+        
+        mock_call_llm.assert_called_once()
+        assert UserProfileManager.get_user_profile(db_session, 910006) == "Фоновый профиль."
+
+    def test_update_profile_async_works_across_event_loops(self):
+        """Test that background updates run on more than one event loop (one semaphore per loop)."""
+        import asyncio
+        import src.user_profile_manager as upm
+        
+        mock_call_llm = Mock(return_value="Профиль.")
+        seen = []
+        
+        async def run_update():
+            await update_profile_after_interaction_async(
+                telegram_id=910013,
+                latest_user_message="Как дела?",
+                latest_assistant_response="Хорошо!",
+                call_llm_func=mock_call_llm
+            )
+            seen.append(upm._profile_update_semaphores[asyncio.get_running_loop()])
+        
+        asyncio.run(run_update())
+        asyncio.run(run_update())
+        
+        assert mock_call_llm.call_count == 2
+        assert seen[0] is not seen[1]
+
+    @patch('src.user_profile_manager.update_profile_after_interaction_async')
+    async def test_schedule_profile_update_coalesces_rapid_turns(self, mock_update):
+        """Test that back-to-back turns schedule only one profile update."""
+        import src.user_profile_manager as upm
+        upm._last_profile_update.pop(910008, None)
+        
+        first = schedule_profile_update(910008, "Привет", "Привет!")
+        second = schedule_profile_update(910008, "Как дела?", "Хорошо!")
+        await first
+        third = schedule_profile_update(910008, "А завтра?", "Посмотрим.")
+        
+        assert first is not None
+        assert second is None, "Should skip while an update is running"
+        assert third is None, "Should skip within the minimum interval"
+        mock_update.assert_called_once_with(910008, "Привет", "Привет!")
+        upm._last_profile_update.pop(910008, None)
+
+    @patch('src.user_profile_manager.update_profile_after_interaction_async')
+    async def test_schedule_profile_update_prunes_expired_debounce_entries(self, mock_update):
+        """Test that debounce bookkeeping only keeps users inside the interval."""
+        import time
+        import src.user_profile_manager as upm
+        upm._last_profile_update.pop(910011, None)
+        
+        stale = time.monotonic() - 2 * upm.PROFILE_UPDATE_MIN_INTERVAL_SECONDS
+        upm._last_profile_update[910012] = stale
+        upm._last_profile_update.move_to_end(910012, last=False)
+        
+        await schedule_profile_update(910011, "Что с карьерой?", "Смотрим десятый дом.")
+        
+        assert 910012 not in upm._last_profile_update
+        assert 910011 in upm._last_profile_update
+        upm._last_profile_update.pop(910011, None)
+
+    @patch('src.user_profile_manager.update_profile_after_interaction_async')
+    async def test_schedule_profile_update_skips_trivial_messages(self, mock_update):
+        """Test that acknowledgements don't trigger a profile rewrite."""
+        import src.user_profile_manager as upm
+        upm._last_profile_update.pop(910010, None)
+        
+        assert schedule_profile_update(910010, " Спасибо! ", "Пожалуйста!") is None
+        assert schedule_profile_update(910010, "ок", "Хорошо.") is None
+        
+        task = schedule_profile_update(910010, "А что с карьерой?", "Смотрим десятый дом.")
+        await task
+        
+        mock_update.assert_called_once()
+        upm._last_profile_update.pop(910010, None)
 
     def test_update_profile_after_interaction_llm_error(self, db_session):
         """Test that LLM errors don't break the flow."""
         # Setup
-        user = User(telegram_id="test_integration_error")
+        user = User(telegram_id=910001)
         db_session.add(user)
         db_session.commit()
         
@@ -255,7 +380,7 @@ class TestProfileUpdateIntegration:
         try:
             update_profile_after_interaction(
                 session=db_session,
-                telegram_id="test_integration_error",
+                telegram_id=910001,
                 conversation_history=[],
                 latest_user_message="Test",
                 latest_assistant_response="Response",
@@ -265,18 +390,18 @@ class TestProfileUpdateIntegration:
             pytest.fail("update_profile_after_interaction should not raise exception on LLM error")
         
         # Profile should not be created due to error
-        profile = UserProfileManager.get_user_profile(db_session, "test_integration_error")
+        profile = UserProfileManager.get_user_profile(db_session, 910001)
         assert profile is None, "Profile should not be created when LLM fails"
         
         # Cleanup
-        db_session.query(User).filter_by(telegram_id="test_integration_error").delete()
+        db_session.query(User).filter_by(telegram_id=910001).delete()
         db_session.commit()
 
     def test_update_profile_preserves_existing_data_on_update(self, db_session):
         """Test that profile updates preserve all other user data."""
         # Setup user with existing data
         user = User(
-            telegram_id="test_preserve_data",
+            telegram_id=910005,
             state="chatting_about_chart",
             natal_chart_json='{"sun": "Aries"}',
             missing_fields=None,
@@ -292,7 +417,7 @@ class TestProfileUpdateIntegration:
         # Update profile
         update_profile_after_interaction(
             session=db_session,
-            telegram_id="test_preserve_data",
+            telegram_id=910005,
             conversation_history=[],
             latest_user_message="Тест",
             latest_assistant_response="Ответ",
@@ -300,7 +425,7 @@ class TestProfileUpdateIntegration:
         )
         
         # Verify all data preserved
-        updated_user = db_session.query(User).filter_by(telegram_id="test_preserve_data").first()
+        updated_user = db_session.query(User).filter_by(telegram_id=910005).first()
         assert updated_user.state == "chatting_about_chart", "State should be preserved"
         assert updated_user.natal_chart_json == '{"sun": "Aries"}', "Natal chart should be preserved"
         assert updated_user.missing_fields is None, "Missing fields should be preserved"
@@ -308,7 +433,7 @@ class TestProfileUpdateIntegration:
         assert updated_user.user_profile == "Новый профиль", "Profile should be updated"
         
         # Cleanup
-        db_session.query(User).filter_by(telegram_id="test_preserve_data").delete()
+        db_session.query(User).filter_by(telegram_id=910005).delete()
         db_session.commit()
 
 
@@ -320,7 +445,7 @@ class TestBackwardCompatibility:
         """Test that existing users without profile column still work."""
         # Simulate existing user (no profile)
         user = User(
-            telegram_id="test_legacy_user",
+            telegram_id=910003,
             state="has_chart",
             natal_chart_json='{"planets": []}'
         )
@@ -328,34 +453,34 @@ class TestBackwardCompatibility:
         db_session.commit()
         
         # Should return None for profile
-        profile = UserProfileManager.get_user_profile(db_session, "test_legacy_user")
+        profile = UserProfileManager.get_user_profile(db_session, 910003)
         assert profile is None, "Legacy users should have None profile"
         
         # Should be able to update profile
-        UserProfileManager.update_user_profile(db_session, "test_legacy_user", "Новый профиль")
+        UserProfileManager.update_user_profile(db_session, 910003, "Новый профиль")
         
         # Verify update worked and other data preserved
-        updated_user = db_session.query(User).filter_by(telegram_id="test_legacy_user").first()
+        updated_user = db_session.query(User).filter_by(telegram_id=910003).first()
         assert updated_user.user_profile == "Новый профиль"
         assert updated_user.state == "has_chart", "State should be preserved"
         assert updated_user.natal_chart_json == '{"planets": []}', "Chart should be preserved"
         
         # Cleanup
-        db_session.query(User).filter_by(telegram_id="test_legacy_user").delete()
+        db_session.query(User).filter_by(telegram_id=910003).delete()
         db_session.commit()
 
     def test_profile_column_is_nullable(self, db_session):
         """Test that user_profile column is nullable (doesn't break existing data)."""
         # Create user without specifying profile
-        user = User(telegram_id="test_nullable")
+        user = User(telegram_id=910004)
         db_session.add(user)
         db_session.commit()
         
         # Verify user was created successfully
-        created_user = db_session.query(User).filter_by(telegram_id="test_nullable").first()
+        created_user = db_session.query(User).filter_by(telegram_id=910004).first()
         assert created_user is not None, "User should be created without profile"
         assert created_user.user_profile is None, "Profile should be None by default"
         
         # Cleanup
-        db_session.query(User).filter_by(telegram_id="test_nullable").delete()
+        db_session.query(User).filter_by(telegram_id=910004).delete()
         db_session.commit()
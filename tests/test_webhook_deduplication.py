@@ -38,11 +38,13 @@ def mock_bot_handler():
 def mock_throttle():
     """Mock the message throttling to process messages immediately in tests."""
     with patch('src.main.has_pending_reply') as mock_has_pending, \
-         patch('src.main.get_pending_messages') as mock_get_pending:
+         patch('src.main.count_pending_other_than') as mock_count_pending, \
+         patch('src.main.fetch_pending_texts') as mock_fetch_texts:
         # No pending messages by default - allow processing
         mock_has_pending.return_value = False
-        mock_get_pending.return_value = []
-        yield (mock_has_pending, mock_get_pending)
+        mock_count_pending.return_value = 0
+        mock_fetch_texts.return_value = []
+        yield (mock_has_pending, mock_count_pending, mock_fetch_texts)
 
 
 @pytest.mark.integration
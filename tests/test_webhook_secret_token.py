@@ -7,7 +7,6 @@ environment variable is configured.
 """
 
 import pytest
-import os
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
@@ -40,11 +39,13 @@ def mock_dedup():
 def mock_throttle():
     """Mock the message throttling to avoid timing issues in tests."""
     with patch('src.main.has_pending_reply') as mock_has_pending, \
-         patch('src.main.get_pending_messages') as mock_get_pending:
+         patch('src.main.count_pending_other_than') as mock_count_pending, \
+         patch('src.main.fetch_pending_texts') as mock_fetch_texts:
         # No pending messages by default
         mock_has_pending.return_value = False
-        mock_get_pending.return_value = []
-        yield (mock_has_pending, mock_get_pending)
+        mock_count_pending.return_value = 0
+        mock_fetch_texts.return_value = []
+        yield (mock_has_pending, mock_count_pending, mock_fetch_texts)
 
 
 @pytest.fixture
@@ -74,10 +75,7 @@ class TestWebhookSecretToken:
     ):
         """Test that webhook works normally when TELEGRAM_SECRET_TOKEN is not configured."""
         # Ensure no secret token is set
-        with patch.dict(os.environ, {}, clear=False):
-            if 'TELEGRAM_SECRET_TOKEN' in os.environ:
-                del os.environ['TELEGRAM_SECRET_TOKEN']
-            
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', None):
             response = client.post("/webhook", json=sample_webhook_data)
             assert response.status_code == 200
             result = response.json()
@@ -91,7 +89,7 @@ class TestWebhookSecretToken:
         """Test that webhook accepts requests with valid secret token."""
         secret_token = "test_secret_token_12345"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             response = client.post(
                 "/webhook",
                 json=sample_webhook_data,
@@ -111,7 +109,7 @@ class TestWebhookSecretToken:
         secret_token = "correct_secret_token"
         wrong_token = "wrong_secret_token"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             response = client.post(
                 "/webhook",
                 json=sample_webhook_data,
@@ -131,7 +129,7 @@ class TestWebhookSecretToken:
         """Test that webhook rejects requests with missing secret token header."""
         secret_token = "required_secret_token"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             # Don't include the header at all
             response = client.post("/webhook", json=sample_webhook_data)
             assert response.status_code == 200
@@ -148,7 +146,7 @@ class TestWebhookSecretToken:
         """Test that webhook rejects requests with empty secret token header."""
         secret_token = "required_secret_token"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             response = client.post(
                 "/webhook",
                 json=sample_webhook_data,
@@ -169,7 +167,7 @@ class TestWebhookSecretToken:
         secret_token = "CaseSensitiveToken"
         wrong_case_token = "casesensitivetoken"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             response = client.post(
                 "/webhook",
                 json=sample_webhook_data,
@@ -188,7 +186,7 @@ class TestWebhookSecretToken:
         """Test that secret tokens with special characters work correctly."""
         secret_token = "token!@#$%^&*()_+-={}[]|:;<>?,./"
         
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": secret_token}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', secret_token):
             response = client.post(
                 "/webhook",
                 json=sample_webhook_data,
@@ -204,7 +202,7 @@ class TestWebhookSecretToken:
         sample_webhook_data
     ):
         """Test that empty TELEGRAM_SECRET_TOKEN env var disables verification."""
-        with patch.dict(os.environ, {"TELEGRAM_SECRET_TOKEN": ""}):
+        with patch('src.main.TELEGRAM_SECRET_TOKEN', ""):
             # No header provided
             response = client.post("/webhook", json=sample_webhook_data)
             assert response.status_code == 200